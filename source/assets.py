@@ -0,0 +1,225 @@
+import pygame
+import os
+import json
+from os import walk
+from collections import OrderedDict
+from pytmx.util_pygame import pygame_image_loader, handle_transformation, smart_convert
+from profiler import startup
+
+# Written by bake.py, when present sprites are served from the atlas pages instead of single files
+ATLAS_INDEX = './data/atlas.json'
+
+# Process-wide caches, every sprite that asks for the same asset gets the same surfaces back
+_image_cache = {}
+_animation_cache = {}
+_atlas = None
+_atlas_colorkeys = {}
+
+
+def frame_number(file_name):
+    """Sort key for numbered frame files such as '3.png'."""
+    return int(''.join(filter(str.isdigit, file_name)) or 0)
+
+
+def scale_surface(surf, scale):
+    if scale == 1:
+        return surf
+    return pygame.transform.scale(surf, (int(surf.get_width() * scale), int(surf.get_height() * scale)))
+
+
+def atlas_key(path, scale=1):
+    """Name of a sprite in the atlas index, e.g. 'graphics/enemy/Walk/1.png@2'."""
+    return f"{os.path.normpath(path).replace(os.sep, '/')}@{float(scale):g}"
+
+
+def load_atlas():
+    """Loads the baked atlas pages and index once. Returns None when the game has not been baked."""
+    global _atlas
+    if _atlas is None:
+        _atlas = {}
+        if os.path.exists(ATLAS_INDEX):
+            with startup.phase('atlas load'), open(ATLAS_INDEX) as file:
+                index = json.load(file)
+                pages = [pygame.image.load(page).convert_alpha() for page in index['pages']]
+                for key, (page, x, y, width, height) in index['sprites'].items():
+                    _atlas[key] = pages[page].subsurface((x, y, width, height))
+                _atlas_colorkeys.update({key: tuple(color) for key, color in index.get('colorkeys', {}).items()})
+    return _atlas or None
+
+
+def atlas_image(path, scale=1):
+    atlas = load_atlas()
+    if atlas is None:
+        return None
+    return atlas.get(atlas_key(path, scale))
+
+
+def load_image(path, scale=1, alpha=True):
+    """
+    Loads an image from disk once and returns the shared, converted surface.
+
+    Args:
+        path (str): Path to the image file.
+        scale (float): Scale factor applied once after loading.
+        alpha (bool): Use convert_alpha() instead of convert().
+
+    Returns:
+        pygame.Surface: The cached surface. Callers must not draw onto it.
+    """
+    key = (os.path.normpath(path), scale, alpha)
+    surf = _image_cache.get(key)
+    if surf is None and alpha:
+        surf = atlas_image(path, scale)
+        if surf is not None:
+            _image_cache[key] = surf
+    if surf is None:
+        with startup.phase(f'load {path}'):
+            surf = pygame.image.load(path)
+            surf = surf.convert_alpha() if alpha else surf.convert()
+            surf = scale_surface(surf, scale)
+        _image_cache[key] = surf
+    return surf
+
+
+class AnimationFrame:
+    """
+    One animation frame plus the collision data derived from it, computed once at asset load.
+
+    The hitbox is the bounding rect of the visible pixels, relative to the image's top left.
+    White damage silhouettes are only built the first time they are asked for.
+    """
+    __slots__ = ('image', 'mask', 'hitbox', 'flipped_image', 'flipped_mask', 'flipped_hitbox', 'silhouettes')
+
+    def __init__(self, image):
+        self.image = image
+        self.mask, self.hitbox = self.collision_data(image)
+        self.flipped_image = pygame.transform.flip(image, True, False)
+        self.flipped_mask, self.flipped_hitbox = self.collision_data(self.flipped_image)
+        self.silhouettes = [None, None]
+
+    @staticmethod
+    def collision_data(image):
+        mask = pygame.mask.from_surface(image)
+        rects = mask.get_bounding_rects()
+        return mask, rects[0] if rects else image.get_rect()
+
+    def variant(self, flip=False):
+        """Returns (image, mask, hitbox), mirrored horizontally if flip is set."""
+        if flip:
+            return self.flipped_image, self.flipped_mask, self.flipped_hitbox
+        return self.image, self.mask, self.hitbox
+
+    def silhouette(self, flip=False):
+        """Returns the frame as a white silhouette, used for the damage blink."""
+        silhouette = self.silhouettes[flip]
+        if silhouette is None:
+            silhouette = (self.flipped_mask if flip else self.mask).to_surface()
+            silhouette.set_colorkey((0, 0, 0))
+            self.silhouettes[flip] = silhouette
+        return silhouette
+
+
+def folder_loader(path, scale):
+    """Loads one animation per sub folder, e.g. ./graphics/enemy/Walk/1.png -> animations['Walk']."""
+    animations = {}
+    for index, folder in enumerate(walk(path)):
+        if index == 0:
+            for name in folder[1]:
+                animations[name] = []
+        else:
+            key = os.path.basename(folder[0])
+            for file_name in sorted(folder[2], key=frame_number):
+                frame_path = os.path.join(folder[0], file_name)
+                animations[key].append(load_image(frame_path, scale))
+    return animations
+
+
+def load_animations(path, scale=1, loader=folder_loader):
+    """
+    Returns the animation dictionary for a path, loading it on first use only.
+
+    Args:
+        path (str): Root folder of the animation set.
+        scale (float): Scale factor applied to every frame.
+        loader (callable): Function taking (path, scale) and returning {name: [frames]}.
+            Must be a plain function so it can be part of the cache key.
+
+    Returns:
+        dict: Shared {animation name: [AnimationFrame]} mapping. Callers must not mutate it.
+    """
+    key = (os.path.normpath(path), scale, loader)
+    animations = _animation_cache.get(key)
+    if animations is None:
+        with startup.phase(f'animations {path}'):
+            animations = {name: [AnimationFrame(surf) for surf in frames] for name, frames in loader(path, scale).items()}
+        _animation_cache[key] = animations
+    return animations
+
+
+class SurfaceCache:
+    """
+    Size bounded LRU cache for surfaces derived at runtime (rotations, rendered text...).
+
+    Args:
+        maxsize (int): Number of surfaces kept before the least recently used one is dropped.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key, factory):
+        """Returns the surface stored under key, creating it with factory() on a miss."""
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            return surf
+        surf = factory()
+        self.entries[key] = surf
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+_text_cache = SurfaceCache(256)
+
+
+def render_text(font, text, color, antialias=True):
+    """Renders text through a shared LRU cache keyed by (font, text, color, antialias)."""
+    key = (font, text, color if isinstance(color, str) else tuple(color), antialias)
+    return _text_cache.get(key, lambda: font.render(text, antialias, color))
+
+
+def tmx_image_loader(filename, colorkey, **kwargs):
+    """
+    pytmx image loader that takes tile images from the baked atlas when they are in it.
+
+    Source images with a colorkey (palette PNGs) are still loaded from disk. pytmx decides per
+    tile whether to keep the colorkey from the palette pixels, which the atlas page no longer has.
+    """
+    surf = atlas_image(os.path.relpath(filename))
+    if surf is None or atlas_key(os.path.relpath(filename)) in _atlas_colorkeys:
+        return pygame_image_loader(filename, colorkey, **kwargs)
+    if colorkey:
+        colorkey = pygame.Color(f'#{colorkey}')
+
+    def load_tile(rect=None, flags=None):
+        tile = surf.subsurface(rect) if rect else surf
+        if flags:
+            tile = handle_transformation(tile, flags)
+        return smart_convert(tile, colorkey, kwargs.get('pixelalpha', True))
+    return load_tile
+
+
+def clear_cache():
+    global _atlas
+    _atlas = None
+    _atlas_colorkeys.clear()
+    _image_cache.clear()
+    _animation_cache.clear()
+    _text_cache.clear()
@@ -0,0 +1,120 @@
+import pygame
+from profiler import startup
+
+# Channel group -> number of reserved voices. A group never plays more sounds at once than this,
+# when it is full the voice that started first is cut off.
+CHANNEL_GROUPS = {
+    'player': 3,
+    'enemy': 4,
+    'doors': 2,
+    'ui': 1,
+}
+
+
+class Clip:
+    """A decoded sound bound to a channel group. Behaves like a pygame.mixer.Sound for play/stop."""
+    def __init__(self, manager, sound, group, volume=1):
+        self.manager = manager
+        self.sound = sound
+        self.group = group
+        self.volume = volume
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def play(self):
+        self.manager.play(self)
+
+    def stop(self):
+        self.manager.stop(self)
+
+
+class SoundManager:
+    """
+    Decodes every sound file once, plays clips on reserved channel groups and streams music.
+
+    Everything is a no-op when the mixer could not be initialised (no audio device) or muted is set.
+    """
+    def __init__(self, groups=CHANNEL_GROUPS):
+        self.muted = False
+        self.group_sizes = groups
+        self.sounds = {}
+        self.groups = None
+        self.start_times = {}
+
+    @property
+    def enabled(self):
+        return not self.muted and pygame.mixer.get_init() is not None
+
+    def setup_channels(self):
+        reserved = sum(self.group_sizes.values())
+        if pygame.mixer.get_num_channels() < reserved:
+            pygame.mixer.set_num_channels(reserved)
+        pygame.mixer.set_reserved(reserved)
+
+        self.groups = {}
+        index = 0
+        for name, size in self.group_sizes.items():
+            self.groups[name] = [pygame.mixer.Channel(index + i) for i in range(size)]
+            index += size
+
+    def load(self, path):
+        sound = self.sounds.get(path)
+        if sound is None and self.enabled:
+            with startup.phase(f'decode {path}'):
+                sound = pygame.mixer.Sound(path)
+            self.sounds[path] = sound
+        return sound
+
+    def clip(self, path, group, volume=1):
+        """
+        Returns a Clip for a sound file, decoding the file only the first time it is asked for.
+
+        Args:
+            path (str): Path to the sound file.
+            group (str): Channel group the clip plays on, see CHANNEL_GROUPS.
+            volume (float): Playback volume between 0 and 1.
+        """
+        return Clip(self, self.load(path), group, volume)
+
+    def play(self, clip):
+        if clip.sound is None or not self.enabled:
+            return
+        if self.groups is None:
+            self.setup_channels()
+
+        channels = self.groups[clip.group]
+        channel = next((channel for channel in channels if not channel.get_busy()), None)
+        if channel is None:
+            channel = min(channels, key=lambda channel: self.start_times.get(channel, 0))
+        channel.set_volume(clip.volume)
+        channel.play(clip.sound)
+        self.start_times[channel] = pygame.time.get_ticks()
+
+    def stop(self, clip):
+        if self.groups is None:
+            return
+        for channel in self.groups[clip.group]:
+            if channel.get_sound() is clip.sound:
+                channel.stop()
+
+    def stop_group(self, group):
+        if self.groups is None:
+            return
+        for channel in self.groups[group]:
+            channel.stop()
+
+    def play_music(self, path, volume=1, loops=0):
+        """Streams a music file through pygame.mixer.music instead of decoding it into memory."""
+        if not self.enabled:
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
+
+    def stop_music(self):
+        if self.enabled:
+            pygame.mixer.music.stop()
+
+
+sounds = SoundManager()
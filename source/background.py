@@ -0,0 +1,58 @@
+import pygame
+from assets import SurfaceCache
+
+
+class ChunkedBackground:
+    """
+    The static tile layers of the map (floor and walls) pre-composited into fixed size chunks.
+
+    A chunk is only drawn together the first time it comes into view, after that the whole
+    chunk is one blit. Chunks that have not been on screen for a while are dropped from the
+    cache and rebuilt if the camera comes back.
+
+    Args:
+        map_data (MapData): Parsed map to read the tile layers from.
+        layer_names (iterable): Tile layers to composite, bottom first.
+        chunk_size (int): Width and height of a chunk in pixels, rounded down to whole tiles.
+        max_chunks (int): Number of chunk surfaces kept in memory.
+    """
+    def __init__(self, map_data, layer_names=('Floor', 'Walls', 'Pistonwall'), chunk_size=512, max_chunks=32):
+        self.tile_size = map_data.tile_size
+        self.chunk_tiles = max(chunk_size // self.tile_size, 1)
+        self.chunk_size = self.chunk_tiles * self.tile_size
+        self.width = map_data.width * self.tile_size
+        self.height = map_data.height * self.tile_size
+        self.chunks = SurfaceCache(max_chunks)
+
+        # (chunk col, chunk row) -> [(surface, position inside the chunk)], in layer order
+        self.tiles = {}
+        for name in layer_names:
+            for x, y, surf in map_data.get_layer(name).tiles():
+                key = (x // self.chunk_tiles, y // self.chunk_tiles)
+                pos = ((x % self.chunk_tiles) * self.tile_size, (y % self.chunk_tiles) * self.tile_size)
+                self.tiles.setdefault(key, []).append((surf, pos))
+
+    def build_chunk(self, key):
+        col, row = key
+        width = min(self.chunk_size, self.width - col * self.chunk_size)
+        height = min(self.chunk_size, self.height - row * self.chunk_size)
+        chunk = pygame.Surface((width, height)).convert()
+        chunk.fill('black')
+        chunk.blits(self.tiles.get(key, []), False)
+        return chunk
+
+    def chunk(self, col, row):
+        return self.chunks.get((col, row), lambda: self.build_chunk((col, row)))
+
+    def draw(self, surface, offset):
+        """Blits the chunks that overlap the view, offset is the camera's top left in world space."""
+        size = self.chunk_size
+        col_start = max(int(offset.x) // size, 0)
+        row_start = max(int(offset.y) // size, 0)
+        col_end = min((int(offset.x) + surface.get_width()) // size + 1, -(-self.width // size))
+        row_end = min((int(offset.y) + surface.get_height()) // size + 1, -(-self.height // size))
+        blits = []
+        for row in range(row_start, row_end):
+            for col in range(col_start, col_end):
+                blits.append((self.chunk(col, row), (col * size - offset.x, row * size - offset.y)))
+        surface.blits(blits, False)
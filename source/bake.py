@@ -0,0 +1,113 @@
+# Offline asset bake, run from the game folder: python bake.py
+# Packs every sprite the game loads, already at its in-game scale, into a few atlas pages
+# plus a JSON index. assets.load_image then serves those sprites as subsurfaces of the pages.
+import os
+import sys
+import json
+import glob
+import argparse
+import pygame
+from assets import ATLAS_INDEX, atlas_key, scale_surface
+
+# (glob pattern, scale) for everything loaded through assets.load_image or the map
+BAKE_SETS = [
+    ('./graphics/enemy/*/*.png', 2),
+    ('./graphics/enemy/Projectile.png', 1),
+    ('./graphics/player/*.png', 2),
+    ('./graphics/player/*.png', 1.5),
+    ('./graphics/other/*.png', 1),
+    ('./graphics/other/bullet.png', 2),
+    ('./graphics/key.png', 2.5),
+    ('./graphics/tileset/*.png', 1),
+]
+# Old hand exported map render, the game composites the background from the tile layers instead
+EXCLUDE = {os.path.normpath('./graphics/other/map.png')}
+PADDING = 1
+
+
+def collect_sprites():
+    """
+    Returns ({key: surface}, {key: [r, g, b]}). The second dict holds the colorkey of every
+    source image that has one (palette PNGs), the atlas pages can't carry it themselves.
+    """
+    sprites = {}
+    colorkeys = {}
+    for pattern, scale in BAKE_SETS:
+        for path in sorted(glob.glob(pattern)):
+            if os.path.normpath(path) in EXCLUDE:
+                continue
+            key = atlas_key(path, scale)
+            if key not in sprites:
+                image = pygame.image.load(path)
+                colorkey = image.get_colorkey()
+                if colorkey is not None:
+                    colorkeys[key] = list(colorkey[:3])
+                sprites[key] = scale_surface(image.convert_alpha(), scale)
+    return sprites, colorkeys
+
+
+def pack(sprites, page_size):
+    """
+    Shelf packer: sprites are placed tallest first, left to right, in rows.
+
+    Returns:
+        (list of page sizes, {key: [page, x, y, w, h]})
+    """
+    placements = {}
+    pages = [[0, 0]]
+    x = y = shelf_height = 0
+    page = 0
+    for key, surf in sorted(sprites.items(), key=lambda item: (-item[1].get_height(), item[0])):
+        width, height = surf.get_size()
+        if width > page_size or height > page_size:
+            raise ValueError(f'{key} ({width}x{height}) does not fit on a {page_size}px atlas page')
+        if x + width > page_size:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if y + height > page_size:
+            page += 1
+            pages.append([0, 0])
+            x = y = shelf_height = 0
+        placements[key] = [page, x, y, width, height]
+        pages[page][0] = max(pages[page][0], x + width)
+        pages[page][1] = max(pages[page][1], y + height)
+        x += width + PADDING
+        shelf_height = max(shelf_height, height + PADDING)
+    return pages, placements
+
+
+def bake(page_size=2048, index_path=ATLAS_INDEX, out_dir='./graphics/atlas'):
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+    sprites, colorkeys = collect_sprites()
+    pages, placements = pack(sprites, page_size)
+
+    os.makedirs(out_dir, exist_ok=True)
+    page_paths = []
+    for page, size in enumerate(pages):
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        for key, (sprite_page, x, y, width, height) in placements.items():
+            if sprite_page == page:
+                surf.blit(sprites[key], (x, y))
+        page_path = os.path.join(out_dir, f'atlas_{page}.png').replace('\\', '/')
+        pygame.image.save(surf, page_path)
+        page_paths.append(page_path)
+
+    with open(index_path, 'w') as file:
+        json.dump({'version': 1, 'pages': page_paths, 'sprites': placements, 'colorkeys': colorkeys}, file, indent=1, sort_keys=True)
+    print(f'Baked {len(sprites)} sprites into {len(page_paths)} atlas page(s), index written to {index_path}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pack the game sprites into texture atlas pages.')
+    parser.add_argument('--page-size', type=int, default=2048, help='Maximum atlas page width and height in pixels')
+    parser.add_argument('--index', default=ATLAS_INDEX, help='Where to write the JSON index')
+    parser.add_argument('--out-dir', default='./graphics/atlas', help='Folder for the atlas page images')
+    args = parser.parse_args()
+    try:
+        bake(args.page_size, args.index, args.out_dir)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
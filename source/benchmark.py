@@ -0,0 +1,401 @@
+# Microbenchmarks for the engine's hot paths, run from the game folder: python benchmark.py
+# Every benchmark runs on a synthetic world of a given size (walls, enemies, bullets) so the numbers
+# don't depend on the level. Results are written to JSON and can be compared against a baseline:
+#   python benchmark.py --save benchmark_baseline.json                  (new baseline)
+#   python benchmark.py --compare benchmark_baseline.json --threshold 0.25
+# Each case is timed against a fixed calibration workload measured alongside it, and compared with
+# the baseline as that ratio, so a machine that is busier or slower than when the baseline was made
+# doesn't show up as a regression.
+# Timings are machine specific, make the baseline on the machine you compare on.
+import gc
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import statistics
+import contextlib
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+from main import Game, Allsprites, init_display
+from settings import PATHS
+from assets import load_animations, clear_cache
+from audio import sounds
+from background import ChunkedBackground
+from bullets import BulletManager, FACTION_PLAYER, FACTION_ENEMY
+from controls import ScriptedInput
+from entity import Entity
+from flowfield import FlowField
+from monster import Monster, HybridEnemy
+from obstacles import Obstacles
+from player import Player
+from spawner import Spawner
+from tilegrid import TileGrid
+import simtime
+
+BASELINE_PATH = './benchmark_baseline.json'
+TILE_SIZE = 32
+DT = 1 / 120
+
+
+class SyntheticLayer:
+    def __init__(self, cells, surf):
+        self.cells = cells
+        self.surf = surf
+
+    def tiles(self):
+        for x, y in self.cells:
+            yield x, y, self.surf
+
+
+class SyntheticMap:
+    """
+    A square map with the same interface as MapData: a full floor and walls scattered at random,
+    with a clear area in the middle for the player, the enemies and a spawner.
+
+    Args:
+        size (int): Width and height in tiles.
+        walls (int): Number of wall tiles.
+        seed (int): Seed for the wall layout.
+        clear_radius (int): Tiles around the centre that stay free of walls.
+    """
+    def __init__(self, size=100, walls=500, seed=1, clear_radius=10):
+        self.tile_size = TILE_SIZE
+        self.width = self.height = size
+        floor_surf = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert()
+        floor_surf.fill((40, 50, 80))
+        wall_surf = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert_alpha()
+        wall_surf.fill((200, 60, 60))
+
+        center = size // 2
+        free = [(x, y) for y in range(size) for x in range(size)
+                if max(abs(x - center), abs(y - center)) > clear_radius]
+        wall_cells = random.Random(seed).sample(free, min(walls, len(free)))
+
+        self.layers = {
+            'Floor': SyntheticLayer([(x, y) for y in range(size) for x in range(size)], floor_surf),
+            'Walls': SyntheticLayer(wall_cells, wall_surf),
+            'Pistonwall': SyntheticLayer([], wall_surf),
+        }
+        self.objects = {}
+        self.center = (center * TILE_SIZE, center * TILE_SIZE)
+        self.spawn_rects = {1: pygame.Rect(0, 0, clear_radius * TILE_SIZE, clear_radius * TILE_SIZE).move(self.center)}
+        self.door_stops = {}
+
+    def get_layer(self, name):
+        return self.layers[name]
+
+    def objects_named(self, name):
+        return self.objects.get(name, [])
+
+
+class World:
+    """
+    The parts of a Game that the benchmarks exercise, built on a SyntheticMap.
+    bullet_collision and create_bullet are Game's own methods.
+
+    Args:
+        walls (int): Wall tiles on the map.
+        enemies (int): HybridEnemies placed around the player.
+        bullets (int): Bullets in flight around the player, half of them fired by enemies.
+        size (int): Map width and height in tiles.
+        seed (int): Seed for everything random in the world.
+    """
+    create_bullet = Game.create_bullet
+    bullet_collision = Game.bullet_collision
+
+    def __init__(self, walls=500, enemies=0, bullets=0, size=100, seed=1):
+        random.seed(seed)
+        simtime.reset()
+        self.display_surface = init_display()
+        self.map_data = SyntheticMap(size, walls, seed)
+        self.all_sprites = Allsprites()
+        self.obstacles = Obstacles()
+        self.monsters = pygame.sprite.Group()
+
+        self.tile_grid = TileGrid(self.map_data, ('Walls', 'Pistonwall'))
+        self.obstacles.grid = self.tile_grid
+        self.all_sprites.background = ChunkedBackground(self.map_data, ('Floor', 'Walls', 'Pistonwall'))
+        self.bullets = BulletManager(pygame.Rect((0, 0), self.tile_grid.pixel_size))
+        self.all_sprites.bullets = self.bullets
+
+        self.player = Player(self.map_data.center, self.all_sprites, PATHS['player'], self.obstacles,
+                             self.create_bullet, self.display_surface, ScriptedInput())
+        self.flow_field = FlowField(self.tile_grid)
+        Monster.flow_field = self.flow_field
+        self.flow_field.update(self.player.rect.center)
+
+        self.enemies = []
+        for _ in range(enemies):
+            self.enemies.append(HybridEnemy(self.free_position(600), [self.obstacles, self.monsters, self.all_sprites],
+                                            './graphics/enemy', self.obstacles, self.player, self.create_bullet))
+
+        surf = self.enemies[0].projectile_image if self.enemies else self.player.bullet_surf
+        for index in range(bullets):
+            angle = random.uniform(0, 2 * math.pi)
+            faction = FACTION_ENEMY if index % 2 else FACTION_PLAYER
+            self.bullets.spawn(self.free_position(800), pygame.math.Vector2(math.cos(angle), math.sin(angle)), faction, surf)
+        self.bullet_state = self.save_bullets()
+
+    def free_position(self, radius):
+        """A random point within radius of the player that is not on a wall."""
+        center_x, center_y = self.map_data.center
+        while True:
+            pos = (center_x + random.uniform(-radius, radius), center_y + random.uniform(-radius, radius))
+            if not self.tile_grid.is_solid(*self.tile_grid.cell_at(pos)):
+                return pos
+
+    def save_bullets(self):
+        bullets = self.bullets
+        return [array.copy() for array in (bullets.pos, bullets.prev_pos, bullets.velocity, bullets.ttl, bullets.alive)], list(bullets.free)
+
+    def reset(self):
+        """Puts bullets and health back to how they were built, so every run does the same work."""
+        arrays, free = self.bullet_state
+        bullets = self.bullets
+        for target, saved in zip((bullets.pos, bullets.prev_pos, bullets.velocity, bullets.ttl, bullets.alive), arrays):
+            np.copyto(target, saved)
+        bullets.free = list(free)
+        for sprite in [self.player] + self.enemies:
+            sprite.health = 1000
+            sprite.is_vulnerable = True
+
+
+def bench_collision(walls, enemies):
+    world = World(walls=walls, enemies=enemies)
+
+    def run():
+        for enemy in world.enemies:
+            enemy.collision('horizontal')
+            enemy.collision('vertical')
+    return run
+
+
+def bench_is_obstructed(walls, pairs):
+    world = World(walls=walls, enemies=1)
+    entity = world.enemies[0]
+    points = [(world.free_position(800), world.free_position(800)) for _ in range(pairs)]
+
+    def run():
+        world.obstacles.los_cache.clear()  # measure the raycasts, not the cache
+        for start, end in points:
+            entity.is_obstructed(start, end)
+    return run
+
+
+def bench_bresenham(length):
+    def run():
+        Entity.bresenham(0, 0, length, length // 2)
+    return run
+
+
+def bench_bullet_collision(walls, enemies, bullets):
+    world = World(walls=walls, enemies=enemies, bullets=bullets)
+
+    def run():
+        world.reset()
+        world.bullets.update(DT)
+        world.bullet_collision()
+    return run
+
+
+def bench_customize_draw(walls, enemies, bullets):
+    world = World(walls=walls, enemies=enemies, bullets=bullets)
+
+    def run():
+        world.all_sprites.save_positions()
+        world.all_sprites.customize_draw(world.player, 0.5)
+    return run
+
+
+def bench_animate(enemies):
+    world = World(enemies=enemies)
+
+    def run():
+        for enemy in world.enemies:
+            enemy.animate(DT)
+    return run
+
+
+def bench_spawn_enemy(walls):
+    world = World(walls=walls)
+    spawner = Spawner(world.map_data.center, [world.all_sprites, world.obstacles], world.obstacles, world.player,
+                      world.create_bullet, [world.obstacles, world.monsters, world.all_sprites], 1, world.map_data)
+    spawner.rect.center = (world.map_data.center[0] + 200, world.map_data.center[1])
+    world.obstacles.moved(spawner)
+
+    def run():
+        spawner.spawn_enemy()
+        for enemy in spawner.spawned_enemies:
+            enemy.kill()
+        spawner.spawned_enemies.clear()
+    return run
+
+
+def bench_asset_import():
+    def run():
+        clear_cache()
+        load_animations('./graphics/enemy', 2)
+        load_animations(PATHS['player'], 2, Player.load_sheets)
+    return run
+
+
+# name -> (benchmark, parameter sets)
+BENCHMARKS = {
+    'collision': (bench_collision, [dict(walls=500, enemies=20), dict(walls=3000, enemies=100)]),
+    'is_obstructed': (bench_is_obstructed, [dict(walls=500, pairs=100), dict(walls=3000, pairs=100)]),
+    'bresenham': (bench_bresenham, [dict(length=100), dict(length=1000)]),
+    'bullet_collision': (bench_bullet_collision, [dict(walls=500, enemies=20, bullets=50), dict(walls=3000, enemies=50, bullets=500)]),
+    'customize_draw': (bench_customize_draw, [dict(walls=500, enemies=20, bullets=50), dict(walls=3000, enemies=100, bullets=500)]),
+    'animate': (bench_animate, [dict(enemies=20), dict(enemies=100)]),
+    'spawn_enemy': (bench_spawn_enemy, [dict(walls=500)]),
+    'asset_import': (bench_asset_import, [dict()]),
+}
+
+
+def case_name(name, params):
+    return f"{name}[{','.join(f'{key}={value}' for key, value in params.items())}]" if params else name
+
+
+# Fixed workload every case is measured against, see measure()
+CALIBRATION_RECTS = [pygame.Rect(index * 37 % 1000, index * 91 % 1000, 40, 40) for index in range(500)]
+
+
+def calibration():
+    """A mix of interpreter work and small pygame calls, like the hot paths, that never changes."""
+    probe = pygame.Rect(480, 480, 120, 120)
+    hits = []
+    for rect in CALIBRATION_RECTS:
+        if rect.colliderect(probe):
+            hits.append(rect.clip(probe).size)
+    return hits
+
+
+def calls_per_round(run, min_time):
+    """Doubles the calls per round until a round of run() takes at least min_time, like timeit.autorange."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+
+def time_round(run, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        run()
+    return (time.perf_counter() - start) / number
+
+
+def measure(run, repeat, min_time):
+    """
+    Times run() like timeit, in rounds long enough to be measurable and with the garbage collector paused.
+    Every round of run() comes right after a round of calibration(), so whatever slows the machine down
+    at that moment slows both, and the ratio between the two rounds stays put.
+
+    Returns:
+        tuple: (seconds per call for every round, seconds per calibration call for every round, calls per round)
+    """
+    run()  # warm up caches
+    calibration()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = calls_per_round(run, min_time)
+        calibration_number = calls_per_round(calibration, min_time)
+        times, calibration_times = [], []
+        for _ in range(repeat):
+            calibration_times.append(time_round(calibration, calibration_number))
+            times.append(time_round(run, number))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return times, calibration_times, number
+
+
+def run_benchmarks(name_filter='', repeat=25, min_time=0.03):
+    sounds.muted = True
+    results = {}
+    for name, (benchmark, param_sets) in BENCHMARKS.items():
+        for params in param_sets:
+            case = case_name(name, params)
+            if name_filter and name_filter not in case:
+                continue
+            # The game prints a lot while it runs, keep it out of the report
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                times, calibration_times, number = measure(benchmark(**params), repeat, min_time)
+            results[case] = {
+                'median_us': statistics.median(times) * 1e6,
+                'min_us': min(times) * 1e6,
+                'calibration_us': min(calibration_times) * 1e6,
+                'relative': statistics.median(time / calibration_time for time, calibration_time in zip(times, calibration_times)),
+                'calls': number,
+                'rounds': repeat,
+            }
+            print(f"{case:<70} {results[case]['min_us']:>12.1f} us {results[case]['relative']:>10.2f}x calibration")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints every case next to its baseline and returns the names of the cases that got slower than threshold allows.
+    Cases are compared by their time relative to the calibration workload, not in absolute microseconds.
+    """
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get(case)
+        if base is None:
+            print(f'{case:<70} {"new":>12}')
+            continue
+        ratio = result['relative'] / base['relative']
+        slower = ratio > 1 + threshold
+        if slower:
+            regressions.append(case)
+        print(f"{case:<70} {ratio:>11.2f}x {'REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the engine hot paths on synthetic worlds.')
+    parser.add_argument('--filter', default='', help='Only run cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=25, help='Timed rounds per case, each paired with a calibration round')
+    parser.add_argument('--min-time', type=float, default=0.03, help='Minimum seconds per round')
+    parser.add_argument('--save', default='./benchmark_results.json', help='Where to write the results')
+    parser.add_argument('--compare', nargs='?', const=BASELINE_PATH, help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before a case counts as a regression, 0.25 = 25%%')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.repeat, args.min_time)
+    with open(args.save, 'w') as file:
+        json.dump({
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'results': results,
+        }, file, indent=2)
+        file.write('\n')
+    print(f'Results written to {args.save}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}')
+            sys.exit(1)
+        print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
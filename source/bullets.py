@@ -0,0 +1,157 @@
+import pygame
+import numpy as np
+
+# Who fired a bullet
+FACTION_PLAYER = 0
+FACTION_ENEMY = 1
+
+
+class BulletManager:
+    """
+    Every bullet in flight, stored as NumPy arrays (struct of arrays) instead of one sprite each.
+
+    All bullets are moved in one vectorized step. Bullets die when their lifetime runs out or
+    they leave the map, and their slots are recycled for new shots.
+
+    Args:
+        bounds (pygame.Rect): World area bullets may fly in, usually the whole map.
+        capacity (int): Initial number of slots, grows when all are in use.
+        lifetime (float): Seconds a bullet flies before it is removed.
+        speed (float): Pixels per second.
+    """
+    def __init__(self, bounds, capacity=128, lifetime=3.0, speed=400):
+        self.bounds = pygame.Rect(bounds)
+        self.lifetime = lifetime
+        self.speed = speed
+
+        self.pos = np.zeros((capacity, 2))
+        self.prev_pos = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.ttl = np.zeros(capacity)
+        self.faction = np.zeros(capacity, dtype=np.int8)
+        self.surface = np.zeros(capacity, dtype=np.int16)  # index into self.surfaces
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+        # Bullet images are shared, so are their masks
+        self.surfaces = []
+        self.masks = []
+        self.surface_ids = {}
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def grow(self):
+        capacity = len(self.alive)
+        for name in ('pos', 'prev_pos', 'velocity'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros((capacity, 2))]))
+        self.ttl = np.concatenate([self.ttl, np.zeros(capacity)])
+        self.faction = np.concatenate([self.faction, np.zeros(capacity, dtype=np.int8)])
+        self.surface = np.concatenate([self.surface, np.zeros(capacity, dtype=np.int16)])
+        self.alive = np.concatenate([self.alive, np.zeros(capacity, dtype=bool)])
+        self.free.extend(range(capacity * 2 - 1, capacity - 1, -1))
+
+    def surface_index(self, surf):
+        index = self.surface_ids.get(id(surf))
+        if index is None:
+            index = len(self.surfaces)
+            self.surface_ids[id(surf)] = index
+            self.surfaces.append(surf)
+            self.masks.append(pygame.mask.from_surface(surf))
+        return index
+
+    def spawn(self, pos, direction, faction, surf):
+        """Fires a bullet from pos, returns its slot or None if direction has no length."""
+        length = direction.magnitude()
+        if length == 0:
+            return None
+        if not self.free:
+            self.grow()
+        index = self.free.pop()
+        self.pos[index] = pos
+        self.prev_pos[index] = pos
+        self.velocity[index] = (direction.x / length * self.speed, direction.y / length * self.speed)
+        self.ttl[index] = self.lifetime
+        self.faction[index] = faction
+        self.surface[index] = self.surface_index(surf)
+        self.alive[index] = True
+        return index
+
+    def kill(self, index):
+        if self.alive[index]:
+            self.alive[index] = False
+            self.free.append(int(index))
+
+    def clear(self):
+        for index in self.active():
+            self.kill(index)
+
+    def active(self):
+        return np.flatnonzero(self.alive)
+
+    def update(self, dt):
+        alive = self.alive
+        self.prev_pos[alive] = self.pos[alive]
+        self.pos[alive] += self.velocity[alive] * dt
+        self.ttl[alive] -= dt
+
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        bounds = self.bounds
+        expired = alive & ((self.ttl <= 0) | (x < bounds.left) | (x >= bounds.right) | (y < bounds.top) | (y >= bounds.bottom))
+        for index in np.flatnonzero(expired):
+            self.kill(index)
+
+    def rect(self, index):
+        rect = self.surfaces[self.surface[index]].get_rect()
+        rect.center = (self.pos[index, 0], self.pos[index, 1])
+        return rect
+
+    def sweep_rect(self, index):
+        """The area the bullet covered during its last update."""
+        rect = self.rect(index)
+        start = rect.copy()
+        start.center = (self.prev_pos[index, 0], self.prev_pos[index, 1])
+        return rect.union(start)
+
+    def hits(self, index, sprite):
+        """
+        Pixel perfect test against a sprite, at the bullet's current position and, if the
+        path since the last update crosses the sprite's rect, where the path enters it.
+        """
+        mask = self.masks[self.surface[index]]
+        rect = self.rect(index)
+        if mask.overlap(sprite.mask, (sprite.rect.x - rect.x, sprite.rect.y - rect.y)):
+            return True
+        clipped = sprite.rect.clipline(tuple(self.prev_pos[index]), tuple(self.pos[index]))
+        if not clipped:
+            return False
+        rect.center = clipped[0]
+        return mask.overlap(sprite.mask, (sprite.rect.x - rect.x, sprite.rect.y - rect.y)) is not None
+
+    def collide_tiles(self, index, grid):
+        """True if the bullet's path since the last update crossed a wall tile, or it overlaps one now."""
+        if grid.raycast(tuple(self.prev_pos[index]), tuple(self.pos[index])) is not None:
+            return True
+        rect = self.rect(index)
+        mask = self.masks[self.surface[index]]
+        for col, row in grid.solid_cells(rect):
+            for surf in grid.images[(col, row)]:
+                tile_offset = (col * grid.tile_size - rect.x, row * grid.tile_size - rect.y)
+                if mask.overlap(grid.masks[id(surf)], tile_offset):
+                    return True
+        return False
+
+    def draw(self, surface, offset, alpha=1):
+        """
+        Blits every live bullet in one batch, offset is the camera's top left in world space.
+        Bullets are drawn alpha of the way from their previous position to the current one.
+        """
+        indices = self.active()
+        if not len(indices):
+            return
+        positions = self.prev_pos[indices] + (self.pos[indices] - self.prev_pos[indices]) * alpha
+        blits = []
+        for index, x, y in zip(indices.tolist(), positions[:, 0].tolist(), positions[:, 1].tolist()):
+            surf = self.surfaces[self.surface[index]]
+            blits.append((surf, (x - surf.get_width() // 2 - offset.x, y - surf.get_height() // 2 - offset.y)))
+        surface.blits(blits, False)
@@ -0,0 +1,52 @@
+import pygame
+
+# Every key the game reads, nothing else is tracked
+GAME_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_r, pygame.K_e)
+
+
+class InputState:
+    """
+    The keys, mouse position and mouse buttons for one simulation step.
+
+    Args:
+        keys (iterable): Pressed keys out of GAME_KEYS.
+        mouse_pos (tuple): Mouse position in window coordinates.
+        mouse_buttons (tuple): Left, middle and right button states.
+    """
+    __slots__ = ('keys', 'mouse_pos', 'mouse_buttons')
+
+    def __init__(self, keys=(), mouse_pos=(0, 0), mouse_buttons=(False, False, False)):
+        self.keys = frozenset(keys)
+        self.mouse_pos = tuple(mouse_pos)
+        self.mouse_buttons = tuple(bool(button) for button in mouse_buttons)
+
+    def pressed(self, key):
+        return key in self.keys
+
+
+class LiveInput:
+    """Reads the real keyboard and mouse once per simulation step."""
+    def __init__(self):
+        self.state = InputState()
+
+    def poll(self, tick):
+        keys = pygame.key.get_pressed()
+        self.state = InputState([key for key in GAME_KEYS if keys[key]], pygame.mouse.get_pos(), pygame.mouse.get_pressed()[:3])
+        return self.state
+
+
+class ScriptedInput:
+    """
+    Feeds a prepared list of InputStates to the game, one per simulation step.
+    The last state is held once the script runs out, an empty script stands still.
+    """
+    def __init__(self, states=()):
+        self.states = list(states)
+        self.state = InputState()
+
+    def poll(self, tick):
+        if tick < len(self.states):
+            self.state = self.states[tick]
+        elif self.states:
+            self.state = self.states[-1]
+        return self.state
@@ -1,13 +1,19 @@
-import pygame, pytmx
+import pygame
 from sprite import Sprite
+from tilegrid import WALLS
+from spatial import notify_moved
+from assets import load_image
+from audio import sounds
 
 class DoorStopNotFound(Exception):
     pass
 
 class PistonDoor(Sprite):
-    def __init__(self, pos, image_path, groups, pair=None, door_id=None, door_stop=None):
+    blocks_sight = True
+
+    def __init__(self, pos, image_path, groups, map_data, pair=None, door_id=None, door_stop=None):
         print(f"Loading image from path: {image_path}")  # Debugging print
-        surf = pygame.image.load(image_path).convert_alpha()
+        surf = load_image(image_path)
         super().__init__(pos, surf, groups)
         self.path = image_path
         self.rect = self.image.get_rect(topleft=pos)
@@ -18,6 +24,7 @@ class PistonDoor(Sprite):
         self.pair = pair  # Add pair attribute
         print(door_id)
         self.door_id = door_id
+        self.map_data = map_data
         self.direction = self.find_direction()
         PistonDoor.all_doors = pygame.sprite.Group()
         PistonDoor.door_stops = pygame.sprite.Group()
@@ -29,19 +36,7 @@ class PistonDoor(Sprite):
 
 
     def find_door_stop(self):
-        tmx_map = pytmx.load_pygame('./data/map.tmx')
-        found_rects = []
-        for layer in tmx_map.layers:
-            if layer.name == 'Entities':
-                for obj in layer:
-                    if obj.name == 'door_stop':
-                        if obj.door_id == self.door_id:
-                            found_rects.append((pygame.Rect(obj.x, obj.y, obj.width, obj.height)))
-                            door_stop = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
-                            return door_stop
-        
-
-
+        return self.map_data.door_stops.get(self.door_id)
 
     def start_moving(self):
         self.moving = True
@@ -52,7 +47,7 @@ class PistonDoor(Sprite):
     def stop_moving(self):
         self.moving = False
         print('Stopped')
-        pygame.mixer.stop()
+        sounds.stop_group('doors')
 
     def find_direction(self):
         if "down" in self.path:
@@ -69,7 +64,7 @@ class PistonDoor(Sprite):
             return "left"
         return None
 
-    def update(self, dt, walls):
+    def update(self, dt, tile_grid):
         if self.moving:
             # Move the door based on its direction
             if self.direction == 'up':
@@ -83,10 +78,11 @@ class PistonDoor(Sprite):
 
             # Update hitbox position
             self.hitbox.topleft = self.rect.topleft
+            notify_moved(self)
 
             # Check for collision with walls, other doors, or door_stops
             if (
-                pygame.sprite.spritecollide(self, walls, False, pygame.sprite.collide_mask) or
+                tile_grid.collide_mask(self, WALLS) or
                 pygame.sprite.spritecollide(self, PistonDoor.all_doors, False, pygame.sprite.collide_mask) or
                 pygame.sprite.spritecollide(self, PistonDoor.door_stops, False, pygame.sprite.collide_mask) or
                 (self.door_stop and self.hitbox.colliderect(self.door_stop))
@@ -1,10 +1,16 @@
 import pygame
 from pygame.math import Vector2 as vector
-from os import walk
 from settings import *
+from assets import load_animations
+from audio import sounds
+from spatial import notify_moved
+import simtime
 
 
 class Entity(pygame.sprite.Sprite):
+    # Crowd members don't hard collide with each other, they separate softly (see Monster.separate)
+    crowd = False
+
     def __init__(self, pos, groups, path, collision_sprites):
         super().__init__(groups)
 
@@ -12,10 +18,7 @@ class Entity(pygame.sprite.Sprite):
         self.frame_index = 0
         self.status = 'Idle'
 
-        # Ensure the status key exists in the animations dictionary
-
-        print(self.animations)
-        self.image = self.animations[self.status][self.frame_index]    
+        self.set_frame(self.animations[self.status][self.frame_index])
         self.rect = self.image.get_rect(center=pos)
         self.scale_factor = 1.5
 
@@ -26,7 +29,6 @@ class Entity(pygame.sprite.Sprite):
         # collision
         self.hitbox = self.rect.inflate(-self.rect.width * 0.5, 1)
         self.collision_sprites = collision_sprites
-        self.mask = pygame.mask.from_surface(self.image)
 
         # Attack
         self.attacking = False
@@ -38,12 +40,11 @@ class Entity(pygame.sprite.Sprite):
         self.health = 3
         self.is_vulnerable = True
         self.hit_time = None
+        self.blink_period = 100  # ms for one white + one normal phase while invulnerable
         self.score = 0
 
-        self.hit_sound = pygame.mixer.Sound('./sound/ouch.mp3')
-        self.hit_sound.set_volume(DAMAGE_SOUND_VOLUME)
-        self.shoot_sound = pygame.mixer.Sound('./sound/shoot.mp3')
-        self.shoot_sound.set_volume(SHOOT_SOUND_VOLUME)
+        self.hit_sound = sounds.clip('./sound/ouch.mp3', 'player', DAMAGE_SOUND_VOLUME)
+        self.shoot_sound = sounds.clip('./sound/shoot.mp3', 'player', SHOOT_SOUND_VOLUME)
 
     @staticmethod
     def bresenham(x1, y1, x2, y2):
@@ -72,7 +73,8 @@ class Entity(pygame.sprite.Sprite):
     def is_obstructed(self, start_pos, end_pos):
         """
         Checks if there is an obstruction (wall, spawner, or door) between two points,
-        excluding the player and other enemies from the collision check.
+        excluding the player and other enemies from the collision check. Walls are walked
+        cell by cell on the tile grid, see Obstacles.line_of_sight_blocked.
 
         Args:
             start_pos (tuple): The starting position (x, y).
@@ -81,62 +83,29 @@ class Entity(pygame.sprite.Sprite):
         Returns:
             bool: True if there is an obstruction, False otherwise.
         """
-        # Import HybridEnemy and Player inside the function
-        from monster import HybridEnemy
-        from player import Player
-
-        # Create a line from start_pos to end_pos
-        dx = end_pos[0] - start_pos[0]
-        dy = end_pos[1] - start_pos[1]
-        distance = max(abs(dx), abs(dy))  # Use max to ensure diagonal movement is checked
-
-        if distance == 0:
+        if start_pos == end_pos:
             return False  # No distance, no obstruction
-
-        # Increment values for checking each point along the line
-        x_increment = dx / distance
-        y_increment = dy / distance
-
-        # Check each point along the line for collisions with obstacles
-        for i in range(int(distance)):
-            x = int(start_pos[0] + i * x_increment)
-            y = int(start_pos[1] + i * y_increment)
-            
-            # Create a small rect at the current point
-            check_rect = pygame.Rect(x - 2, y - 2, 4, 4)  # Small rect to check for collision
-
-            # Check for collision with any obstacle
-            for obstacle in self.collision_sprites:
-                # Exclude player and enemies from the collision check
-                if isinstance(obstacle, HybridEnemy) or isinstance(obstacle, Player):
-                    continue  # Skip this obstacle
-
-                if check_rect.colliderect(obstacle.rect):
-                    return True  # Obstruction found
-
-        return False  # No obstruction found
+        return self.collision_sprites.line_of_sight_blocked(start_pos, end_pos)
 
     def vulnerability_timer(self):
         if not self.is_vulnerable:
-            current_time = pygame.time.get_ticks()
+            current_time = simtime.get_ticks()
             if (current_time - self.hit_time) > 400:
                 self.is_vulnerable = True
-   
+
+    def wave_value(self):
+        """True during the white half of the blink period, counted from the last hit."""
+        elapsed = simtime.get_ticks() - self.hit_time
+        return elapsed % self.blink_period < self.blink_period / 2
+
     def import_assets(self, path):
-        animations = {}
-
-        for index, folder in enumerate(walk(path)):
-            if index == 0:
-                for name in folder[1]:
-                    animations[name] = []
-            else:
-                for file_name in sorted(folder[2], key=lambda string: int(string.split('.')[0])):
-                    path = folder[0].replace("\\", "/") + '/' + file_name
-                    surf = pygame.image.load(path).convert_alpha()
-                    key = folder[0].split('\\')[1]
-                    animations[key].append(surf)
-        print(animations)
-        return animations
+        return load_animations(path)
+
+    def set_frame(self, frame, flip=False):
+        """Show an AnimationFrame, using its precomputed (optionally mirrored) image and mask."""
+        self.frame = frame
+        self.flipped = flip
+        self.image, self.mask, _ = frame.variant(flip)
 
     def move(self, dt):
         # Normalize
@@ -153,21 +122,26 @@ class Entity(pygame.sprite.Sprite):
         self.hitbox.centery = round(self.pos.y)
         self.rect.centery = self.hitbox.centery
         self.collision('vertical')
+        notify_moved(self)
 
     def collision(self, direction):
-        for sprite in self.collision_sprites.sprites():
-            if sprite.hitbox.colliderect(self.hitbox):
+        # Nearby dynamic obstacles first (hitboxes can stick out of rects by a pixel), then the wall tiles
+        nearby = self.collision_sprites.query_rect(self.hitbox.inflate(2, 2))
+        hitboxes = [sprite.hitbox for sprite in nearby if sprite is not self and not (self.crowd and getattr(sprite, 'crowd', False))]
+        hitboxes += self.collision_sprites.grid.hitboxes_in(self.hitbox)
+        for hitbox in hitboxes:
+            if hitbox.colliderect(self.hitbox):
                 if direction == 'horizontal':
                     if self.direction.x > 0:  # moving right 
-                        self.hitbox.right = sprite.hitbox.left
+                        self.hitbox.right = hitbox.left
                     if self.direction.x < 0:  # moving left
-                        self.hitbox.left = sprite.hitbox.right
+                        self.hitbox.left = hitbox.right
                     self.rect.centerx = self.hitbox.centerx
                     self.pos.x = self.hitbox.centerx
                 else:  # vertical
                     if self.direction.y > 0:  # moving down
-                        self.hitbox.bottom = sprite.hitbox.top
+                        self.hitbox.bottom = hitbox.top
                     if self.direction.y < 0:  # moving up
-                        self.hitbox.top = sprite.hitbox.bottom
+                        self.hitbox.top = hitbox.bottom
                     self.rect.centery = self.hitbox.centery
                     self.pos.y = self.hitbox.centery
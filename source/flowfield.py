@@ -0,0 +1,128 @@
+from collections import deque
+from pygame.math import Vector2 as vector
+
+# 8 neighbours, straight ones first so ties prefer straight moves
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)]
+
+
+class FlowField:
+    """
+    One breadth first search over the tile grid from the player's tile, shared by every enemy.
+
+    The field is only rebuilt when the player moves to another tile or a door opens or closes
+    over other tiles, after that each enemy reads its direction from the field in O(1). A rebuild
+    is a full search, bounded by max_distance, and only clears the cells the last one reached.
+
+    Args:
+        grid (TileGrid): Static walls.
+        max_distance (int): How many tiles away from the player the search goes.
+    """
+    def __init__(self, grid, max_distance=40):
+        self.grid = grid
+        self.max_distance = max_distance
+        self.cols = grid.cols
+        self.rows = grid.rows
+        self.walls = (grid.cells != 0).ravel().tolist()
+        self.distance = [-1] * (self.cols * self.rows)
+        self.reached = []  # cell indexes the last search gave a distance
+        self.target = None
+        self.blocked = None
+        self.directions = {}  # cell index -> vector, filled on demand
+
+    def door_cells(self, doors):
+        cells = set()
+        for door in doors:
+            col_start, col_end, row_start, row_end = self.grid.cell_range(door.hitbox)
+            for row in range(row_start, row_end):
+                for col in range(col_start, col_end):
+                    cells.add(row * self.cols + col)
+        return cells
+
+    def update(self, target_pos, doors=()):
+        """Rebuilds the field if the target tile or the tiles the doors cover changed since the last build."""
+        target = self.grid.cell_at(target_pos)
+        blocked = frozenset(self.door_cells(doors))
+        if target == self.target and blocked == self.blocked:
+            return False
+        self.target = target
+        self.blocked = blocked
+        self.rebuild(blocked)
+        return True
+
+    def rebuild(self, blocked):
+        cols, rows = self.cols, self.rows
+        walls = self.walls
+        distance = self.distance
+        for index in self.reached:
+            distance[index] = -1
+        reached = []
+        self.reached = reached
+        self.directions = {}
+
+        col, row = self.target
+        if not (0 <= col < cols and 0 <= row < rows):
+            return
+        start = row * cols + col
+        distance[start] = 0
+        reached.append(start)
+        queue = deque([(col, row)])
+        while queue:
+            col, row = queue.popleft()
+            next_distance = distance[row * cols + col] + 1
+            if next_distance > self.max_distance:
+                continue
+            for dx, dy in NEIGHBOURS:
+                next_col, next_row = col + dx, row + dy
+                if not (0 <= next_col < cols and 0 <= next_row < rows):
+                    continue
+                index = next_row * cols + next_col
+                if distance[index] != -1 or walls[index] or index in blocked:
+                    continue
+                # No cutting corners past a wall
+                if dx and dy and (walls[row * cols + next_col] or walls[next_row * cols + col]):
+                    continue
+                distance[index] = next_distance
+                reached.append(index)
+                queue.append((next_col, next_row))
+
+    def direction_at(self, pos):
+        """
+        Normalized direction towards the player from a world position, following the field.
+
+        Returns:
+            Vector2 or None: None when pos is on the player's tile or the search never reached it.
+        """
+        col, row = self.grid.cell_at(pos)
+        cols = self.cols
+        if not (0 <= col < cols and 0 <= row < self.rows):
+            return None
+        index = row * cols + col
+        if index in self.directions:
+            return self.directions[index]
+
+        own = self.distance[index]
+        direction = None
+        if own > 0:
+            best = own
+            for dx, dy in NEIGHBOURS:
+                next_col, next_row = col + dx, row + dy
+                if 0 <= next_col < cols and 0 <= next_row < self.rows:
+                    value = self.distance[next_row * cols + next_col]
+                    if 0 <= value < best:
+                        best = value
+                        direction = vector(dx, dy).normalize()
+        self.directions[index] = direction
+        return direction
+
+    def waypoint(self, pos):
+        """
+        Center of the next tile on the way to the player from a world position.
+
+        Returns:
+            Vector2 or None: None where direction_at is None.
+        """
+        direction = self.direction_at(pos)
+        if direction is None:
+            return None
+        col, row = self.grid.cell_at(pos)
+        return vector(self.grid.cell_rect(col + round(direction.x), row + round(direction.y)).center)
@@ -0,0 +1,86 @@
+import pygame
+from assets import render_text
+
+
+class TextLabel:
+    """
+    A piece of HUD text that is only re-rendered when the values it shows change.
+
+    Args:
+        font (pygame.font.Font): Font to render with.
+        template (str): str.format template, e.g. 'Score: {}'.
+        color: Text color.
+    """
+    def __init__(self, font, template, color=(255, 255, 255), antialias=True):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.antialias = antialias
+        self.values = None
+        self.surface = None
+
+    def render(self, *values):
+        if self.surface is None or values != self.values:
+            self.values = values
+            self.surface = render_text(self.font, self.template.format(*values), self.color, self.antialias)
+        return self.surface
+
+
+class HUD:
+    """
+    Score, ammo, hearts and the reload banner composited onto one retained surface.
+
+    The surface is only redrawn when one of the values it shows changes, every other frame
+    costs one blit per box that is on it.
+
+    Args:
+        font (pygame.font.Font): Font for the score, ammo and reload text.
+        heart_surf (pygame.Surface): Image drawn once per point of health.
+        size (tuple): Size of the screen the HUD is drawn on.
+        max_ammo (int): Magazine size shown after the ammo count.
+    """
+    border_color = (255, 255, 255)
+
+    def __init__(self, font, heart_surf, size, max_ammo):
+        self.width, self.height = size
+        self.heart_surf = heart_surf
+        self.max_ammo = max_ammo
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.regions = []  # rects of the surface that have something on them
+        self.state = None
+
+        self.score_label = TextLabel(font, 'Score: {}')
+        self.ammo_label = TextLabel(font, '{}/{}')
+        self.reload_label = TextLabel(font, 'Reloading...')
+
+    def boxed_text(self, text_surf, **anchor):
+        text_rect = text_surf.get_rect(**anchor)
+        self.surface.blit(text_surf, text_rect)
+        box = text_rect.inflate(30, 30)
+        pygame.draw.rect(self.surface, self.border_color, box, width=8, border_radius=5)
+        self.regions.append(box)
+
+    def compose(self, score, ammo, health, reloading):
+        self.surface.fill((0, 0, 0, 0))
+        self.regions = []
+
+        self.boxed_text(self.score_label.render(score), midbottom=(self.width / 4, self.height - 50))
+
+        # Hearts from right to left as health goes down
+        for index in range(min(health, 3)):
+            pos = ((self.width / 60) + 200 - index * 100, self.height / 90)
+            self.regions.append(self.surface.blit(self.heart_surf, pos))
+
+        self.boxed_text(self.ammo_label.render(ammo, self.max_ammo), midbottom=(self.width / 4 * 3, self.height - 50))
+        if reloading:
+            self.boxed_text(self.reload_label.render(), midbottom=(self.width / 5 * 4, self.height / 20 * 2))
+
+    def update(self, score, ammo, health, reloading):
+        """Re-composites the HUD if anything it shows changed since the last call."""
+        state = (score, ammo, health, bool(reloading))
+        if state != self.state:
+            self.state = state
+            self.compose(*state)
+
+    def draw(self, surface):
+        surface.blits([(self.surface, region, region) for region in self.regions], False)
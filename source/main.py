@@ -1,11 +1,17 @@
+from profiler import startup
 import os
+import importlib.util
 from settings import MODS
 import sys
 modules = [
     'pygame',
-    'pytmx'
+    'pytmx',
+    'numpy'
 ]
 def install_modules(modules):
+    # Fast path, nothing to check or install when every module can already be found
+    if all(importlib.util.find_spec(module) for module in modules):
+        return
     consent = MODS
     for module in modules:
         try:
@@ -15,52 +21,172 @@ def install_modules(modules):
                 print('This Game requires the following modules:')
                 print('1: Pygame (Supports main game operation )')
                 print('2: Pytmx (Supports main graphics)')
+                print('3: Numpy (Supports collision)')
                 print('Please consent to these being installed in the settings.py file')
                 sys.exit(1)
             if consent == True:
                 command = f"py -m pip install {module}"
                 os.system(command)
                 print(f"{module} installed successfully.")
-install_modules(modules)
-import pygame, sys
-from settings import * 
-from player import Player
-from pygame.math import Vector2 as vector
-from pytmx.util_pygame import load_pygame
-from sprite import Sprite, Bullet, Button, Key
-from monster import Coffin, Cactus, HybridEnemy
-import time
-from doors import PistonDoor
-from spawner import Spawner
-
-class Allsprites(pygame.sprite.Group):
+with startup.phase('install_modules'):
+    install_modules(modules)
+with startup.phase('imports'):
+    import pygame, sys
+    from settings import * 
+    from player import Player
+    from pygame.math import Vector2 as vector
+    from mapdata import MapData
+    from sprite import Button, Key
+    from monster import Coffin, Cactus, HybridEnemy
+    import time
+    import argparse
+    import random
+    import simtime
+    from doors import PistonDoor
+    from spawner import Spawner
+    from audio import sounds
+    from assets import render_text, load_image
+    from hud import HUD
+    from tilegrid import TileGrid
+    from background import ChunkedBackground
+    from obstacles import Obstacles
+    from spatial import SpatialGroup
+    from flowfield import FlowField
+    from bullets import BulletManager, FACTION_PLAYER, FACTION_ENEMY
+    from monster import Monster
+    from controls import LiveInput, ScriptedInput
+    from replay import Recording, RecordingError, InputRecorder, ReplayInput
+
+class Allsprites(SpatialGroup):
+    """
+    Draws the world in render layers, bottom first:
+    floor (background chunks and flat sprites), actors (depth sorted), projectiles and overlay.
+    A sprite picks its layer with a render_layer class attribute, the default is actors.
+    """
+    # Sprite images are drawn centred on their rect and can be bigger than it, look this far past the screen edge
+    view_margin = 128
+
     def __init__(self):
         super().__init__()
         self.offset = vector()
         self.display_surface = pygame.display.get_surface()
-        self.bg = pygame.image.load('./graphics/other/map.png').convert()
-    
-    def customize_draw(self, player):
-        self.offset.x = player.rect.centerx - WINDOW_WIDTH / 2
-        self.offset.y = player.rect.centery - WINDOW_HEIGHT / 2
-
-        self.display_surface.blit(self.bg, -self.offset)
-        for sprite in sorted(self.sprites(), key = lambda sprite: sprite.rect.centery):
-            offset_rect = sprite.image.get_rect(center = sprite.rect.center)
+        # The world is drawn here, then scaled to the window if the render resolution differs from it
+        if RENDER_RESOLUTION and tuple(RENDER_RESOLUTION) != self.display_surface.get_size():
+            self.world_surface = pygame.Surface(RENDER_RESOLUTION).convert()
+        else:
+            self.world_surface = self.display_surface
+        self.background = None  # ChunkedBackground with the floor and wall tiles
+        self.bullets = None  # BulletManager, drawn on top of the actors
+        self.visible = []  # actors drawn in the last frame, in depth order
+        self.prev_centers = {}  # visible actor -> rect.center before the last simulation step
+        self.alpha = 1
+
+    def save_positions(self):
+        """
+        Remembers where the visible actors are before a simulation step, so frames can be drawn
+        between steps. An actor that just came into view is drawn where it is for one frame.
+        """
+        self.prev_centers = {sprite: sprite.rect.center for sprite in self.visible}
+
+    def render_center(self, sprite):
+        """Where to draw a sprite, between its position before and after the last step by self.alpha."""
+        prev = self.prev_centers.get(sprite)
+        if prev is None:
+            return sprite.rect.center
+        x, y = sprite.rect.center
+        return prev[0] + (x - prev[0]) * self.alpha, prev[1] + (y - prev[1]) * self.alpha
+
+    def blit_sprites(self, sprites):
+        blits = []
+        for sprite in sprites:
+            offset_rect = sprite.image.get_rect(center = self.render_center(sprite))
             offset_rect.center -= self.offset
-            self.display_surface.blit(sprite.image, offset_rect)
+            blits.append((sprite.image, offset_rect))
+        self.world_surface.blits(blits, False)
+    
+    def customize_draw(self, player, alpha=1):
+        """
+        Draws the world around the player.
+
+        Args:
+            alpha (float): How far the frame is between the previous simulation step and the last one, 0 to 1.
+        """
+        self.alpha = alpha
+        surface = self.world_surface
+        width, height = surface.get_size()
+        center_x, center_y = self.render_center(player)
+        self.offset.x = center_x - width / 2
+        self.offset.y = center_y - height / 2
+        view = pygame.Rect(int(self.offset.x), int(self.offset.y), width, height).inflate(self.view_margin * 2, self.view_margin * 2)
+
+        # Floor, never sorted
+        if surface is not self.display_surface:
+            surface.fill('black')
+        if self.background:
+            self.background.draw(surface, self.offset)
+        nearby = self.query_rect(view)
+        self.blit_sprites(sprite for sprite in nearby if getattr(sprite, 'render_layer', 'actors') == 'floor')
+
+        # Actors, only the ones near the camera are sorted. Last frame's order comes first (minus the actors
+        # that left the view) and newcomers go at the end, so the list is nearly sorted and the sort close to linear
+        actors = [sprite for sprite in nearby if getattr(sprite, 'render_layer', 'actors') == 'actors']
+        in_view = set(actors)
+        visible = [sprite for sprite in self.visible if sprite in in_view]
+        kept = set(visible)
+        visible += [sprite for sprite in actors if sprite not in kept]
+        visible.sort(key = lambda sprite: sprite.rect.centery)
+        self.visible = visible
+        self.blit_sprites(visible)
+
+        # Projectiles
+        if self.bullets:
+            self.bullets.draw(surface, self.offset, alpha)
+
+        # Overlay
+        player.draw(surface)
+
+        if surface is not self.display_surface:
+            scale = pygame.transform.smoothscale if SMOOTH_SCALING else pygame.transform.scale
+            scale(surface, self.display_surface.get_size(), self.display_surface)
 
         
+def use_headless_drivers():
+    """Dummy video and audio drivers and no sound, only takes effect before pygame initialises."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    sounds.muted = True
+
+
+def init_display():
+    """Initialises pygame and the window once, later callers get the existing window back."""
+    if not pygame.get_init():
+        with startup.phase('pygame.init'):
+            pygame.init()
+    display_surface = pygame.display.get_surface()
+    if display_surface is None:
+        with startup.phase('display init'):
+            display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption('Apex Assault')
+    return display_surface
+
+
+def finish_startup_profile():
+    startup.finish()
+    if PROFILE_STARTUP:
+        print(startup.report())
+        if STARTUP_PROFILE_PATH:
+            startup.export(STARTUP_PROFILE_PATH)
+            print(f'Startup profile written to {STARTUP_PROFILE_PATH}')
+
+
 class Intro:
     def __init__(self):
-        pygame.init()
-        self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption('Apex Assault')
+        self.display_surface = init_display()
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font('./font/subatomic.ttf', 50)
-        self.music = pygame.mixer.Sound('./sound/music.mp3')
-        self.music.set_volume(MUSIC_VOLUME)
-        self.music.play()
+        with startup.phase('font load'):
+            self.font = pygame.font.Font('./font/subatomic.ttf', 50)
+        with startup.phase('music'):
+            sounds.play_music('./sound/music.mp3', MUSIC_VOLUME)
 
         # Skip text
         self.skip_font = pygame.font.Font('./font/subatomic.ttf', 25)
@@ -72,6 +198,8 @@ class Intro:
         self.scroll_font = pygame.font.Font('./font/subatomic.ttf', 20)
         self.scroll_speed = 0.25  # Adjusted to allow smooth floating-point scrolling
         self.scroll_y = WINDOW_HEIGHT  # Initial y position of scrolling text
+        self.final_text_font_small = pygame.font.Font('./font/subatomic.ttf', 30)
+        self.final_text_font_large = pygame.font.Font('./font/subatomic.ttf', 70)
         self.final_text_y = WINDOW_HEIGHT
         self.show_final_text = False
         self.introing = True
@@ -87,7 +215,7 @@ class Intro:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         if not self.music_stopped:
-                            self.music.stop()
+                            sounds.stop_music()
                             self.music_stopped = True
                             self.show_final_text = True
                             self.final_text_y = WINDOW_HEIGHT / 2 - 130
@@ -102,18 +230,16 @@ class Intro:
             if not self.show_final_text:
                 self.scroll_y -= self.scroll_speed
                 for i, line in enumerate(self.scroll_text):
-                    scroll_text_surf = self.scroll_font.render(line, True, (255, 255, 255))
+                    scroll_text_surf = render_text(self.scroll_font, line, (255, 255, 255))
                     scroll_text_rect = scroll_text_surf.get_rect(center=(WINDOW_WIDTH / 2, self.scroll_y + i * 30))
                     self.display_surface.blit(scroll_text_surf, scroll_text_rect)
                 if self.scroll_y + len(self.scroll_text) * 30 < WINDOW_HEIGHT / 2:
                     self.show_final_text = True
             if self.show_final_text:
                 self.final_text_y -= self.scroll_speed
-                final_text_font_small = pygame.font.Font('./font/subatomic.ttf', 30)
-                final_text_font_large = pygame.font.Font('./font/subatomic.ttf', 70)
-                final_text_small = final_text_font_small.render("This is", True, (255, 255, 255))
-                final_text_large = final_text_font_large.render("Apex Assault", True, (255, 255, 255))
-                combat_text = final_text_font_small.render("Combat", True, (255, 255, 255))
+                final_text_small = render_text(self.final_text_font_small, "This is", (255, 255, 255))
+                final_text_large = render_text(self.final_text_font_large, "Apex Assault", (255, 255, 255))
+                combat_text = render_text(self.final_text_font_small, "Combat", (255, 255, 255))
                 combat_rect = combat_text.get_rect(center=(WINDOW_WIDTH / 2, self.final_text_y + 130))
                 pygame.draw.rect(self.display_surface, (255, 255, 255), combat_rect.inflate(20, 10), 2)
                 self.display_surface.blit(final_text_small, final_text_small.get_rect(center=(WINDOW_WIDTH / 2, self.final_text_y)))
@@ -124,29 +250,45 @@ class Intro:
                     self.final_text_y = WINDOW_HEIGHT / 2 - 130
 
             pygame.display.update()
+            startup.mark('first intro frame')
             self.clock.tick(60)
 
 
 
 
 class Game: 
-    def __init__(self):
-        pygame.init()
-        self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption('Apex Assault')
+    """
+    Args:
+        controls: Input source for the player, LiveInput (the default) or ScriptedInput.
+        headless (bool): Simulation only, without a window or sound, run() steps as fast as it can and draws nothing.
+        seed (int): Seed for the random module, a random one is picked (and kept in self.seed) if None.
+    """
+    def __init__(self, controls=None, headless=False, seed=None):
+        self.controls = controls if controls is not None else LiveInput()
+        self.headless = headless
+        self.tick = 0  # simulation steps so far
+        # Same seed, same inputs, same game
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        random.seed(self.seed)
+        simtime.reset()
+        if headless:
+            use_headless_drivers()
+        self.display_surface = init_display()
         self.clock = pygame.time.Clock()
-        self.bullet_surf = pygame.image.load('./graphics/other/bullet.png').convert_alpha()
+        self.bullet_surf = load_image('./graphics/other/bullet.png')
     
         # Groups
         self.all_sprites = Allsprites()
-        self.obstacles = pygame.sprite.Group()
-        self.bullets = pygame.sprite.Group()
+        self.obstacles = Obstacles()
         self.monsters = pygame.sprite.Group()
         self.spawners = pygame.sprite.Group()
         
         self.enemy_groups = [self.obstacles, self.monsters, self.all_sprites]
-        self.setup()
-        self.font = pygame.font.Font('./font/subatomic.ttf', 50)
+        with startup.phase('setup'):
+            self.setup()
+        with startup.phase('font load'):
+            self.font = pygame.font.Font('./font/subatomic.ttf', 50)
+        self.hud = HUD(self.font, self.heart_surf, self.display_surface.get_size(), AMMO)
         #self.music = pygame.mixer.Sound('./sound/music.mp3')
         #self.music.set_volume(MUSIC_VOLUME)
         #self.music.play(loops = -1)
@@ -154,68 +296,63 @@ class Game:
         self.last_button_press_time = 0  # Initialize the last button press time
         self.button_cooldown = 500  # Cooldown in milliseconds (0.5 seconds)
         self.all_enemies = []  # Global list to track all enemies
+        self.key_spawned = False  # Track whether the key has been spawned
 
     def create_bullet(self, pos, direction, shooter, bullet_surf):
-        Bullet(pos, direction, bullet_surf, [self.all_sprites, self.bullets], shooter)
+        faction = FACTION_PLAYER if shooter == self.player else FACTION_ENEMY
+        self.bullets.spawn(pos, direction, faction, bullet_surf)
 
     def bullet_collision(self):
-        for obstacle in self.obstacles.sprites():
-            if not isinstance(obstacle, Spawner):
-                if not isinstance(obstacle, HybridEnemy):
-                    pygame.sprite.spritecollide(obstacle, self.bullets, True, pygame.sprite.collide_mask)
-
-        # Exclude bullets fired by the player when checking for collisions with the player
-        for bullet in self.bullets.sprites():
-            if bullet.shooter != self.player:  # Ensure the bullet was not fired by the player
-                if pygame.sprite.spritecollide(self.player, [bullet], False, pygame.sprite.collide_mask):
-                    self.player.damage()
-
-        # Handle collisions between bullets and spawners
-        for bullet in self.bullets.sprites():
-            spawners = pygame.sprite.spritecollide(bullet, self.obstacles, False, pygame.sprite.collide_mask)
-            for spawner in spawners:
-                if isinstance(spawner, Spawner):
-                    bullet.kill()
-                    spawner.damage()
-
-        # Handle collisions between bullets and Enemies
-        for bullet in self.bullets.sprites():
-            # Exclude bullets fired by enemies from colliding with other enemies
-            if bullet.shooter == self.player:
-                enemies = pygame.sprite.spritecollide(bullet, self.monsters, False, pygame.sprite.collide_mask)
-                for enemy in enemies:
-                    if isinstance(enemy, HybridEnemy):
-                        print('hit')
-                        bullet.kill()
-                        enemy.damage()
-
-    def ammo_display(self):
-        Highscore_text = f'{self.player.ammo}/{AMMO}'
-        text_surf = self.font.render(Highscore_text, True, (255, 255, 255))
-        text_rect = text_surf.get_rect(midbottom = (WINDOW_WIDTH / 4 * 3, WINDOW_HEIGHT - 50))
-        self.display_surface.blit(text_surf, text_rect)
-        pygame.draw.rect(self.display_surface, (255, 255, 255), text_rect.inflate(30, 30), width = 8, border_radius = 5)
-
-    def Reload_display(self):
-        Highscore_text = f'Reloading...'
-        text_surf = self.font.render(Highscore_text, True, (255, 255, 255))
-        text_rect = text_surf.get_rect(midbottom = (WINDOW_WIDTH / 5 * 4, WINDOW_HEIGHT/ 20 * 2))
-        self.display_surface.blit(text_surf, text_rect)
-        pygame.draw.rect(self.display_surface, (255, 255, 255), text_rect.inflate(30, 30), width = 8, border_radius = 5)
-
+        """
+        One broadphase pass over the bullets. Each bullet's path since the last frame is swept
+        through the tile grid and the obstacle spatial hash, and only the sprites it could have
+        touched get the mask test, so fast bullets can't tunnel through walls on a slow frame.
+        """
+        bullets = self.bullets
+        for index in bullets.active():
+            # Walls end the bullet
+            if bullets.collide_tiles(index, self.tile_grid):
+                bullets.kill(index)
+                continue
+
+            sweep = bullets.sweep_rect(index)
+            hits = [sprite for sprite in self.obstacles.query_rect(sweep) if bullets.hits(index, sprite)]
+
+            # So do doors, buttons and the key
+            if any(not isinstance(sprite, (Spawner, HybridEnemy)) for sprite in hits):
+                bullets.kill(index)
+                continue
+
+            # Exclude bullets fired by the player when checking for collisions with the player
+            from_player = bullets.faction[index] == FACTION_PLAYER
+            if not from_player and sweep.colliderect(self.player.rect) and bullets.hits(index, self.player):
+                self.player.damage()
+
+            for sprite in hits:
+                if isinstance(sprite, Spawner):
+                    bullets.kill(index)
+                    sprite.damage()
+                # Exclude bullets fired by enemies from colliding with other enemies
+                elif from_player:
+                    print('hit')
+                    bullets.kill(index)
+                    sprite.damage()
 
     def setup(self):
-        tmx_map = load_pygame('./data/map.tmx')
-        pistons_layer = tmx_map.get_layer_by_name('Pistons')
+        with startup.phase('map parse'):
+            self.map_data = MapData('./data/map.tmx')
+        pistons_layer = self.map_data.get_layer('Pistons')
 
 
 
         doors = {}
+        self.doors = []
         for obj in pistons_layer:
             image_path = obj.source.replace("..", ".")
             print(f"Door image path: {image_path}")  # Debugging print
             door_id = int(obj.properties['door'])
-            door = PistonDoor((obj.x, obj.y), image_path, [self.all_sprites, self.obstacles], door_id=door_id)
+            door = PistonDoor((obj.x, obj.y), image_path, [self.all_sprites, self.obstacles], self.map_data, door_id=door_id)
+            self.doors.append(door)
             
             if door_id not in doors:
                 doors[door_id] = []
@@ -227,16 +364,22 @@ class Game:
                 door_pair[1].pair = door_pair[0]
 
 
-        self.walls = pygame.sprite.Group()
-        for x, y, surf in tmx_map.get_layer_by_name('Walls').tiles():
-            Sprite((x * 32, y * 32), surf, [self.all_sprites, self.obstacles, self.walls])
-        
-        for x, y, surf in tmx_map.get_layer_by_name('Pistonwall').tiles():
-            Sprite((x * 32, y * 32), surf, [self.all_sprites, self.obstacles])
+        # Walls and piston walls are static, they go into the tile grid instead of becoming sprites
+        self.tile_grid = TileGrid(self.map_data, ('Walls', 'Pistonwall'))
+        self.obstacles.grid = self.tile_grid
+        self.all_sprites.background = ChunkedBackground(self.map_data, ('Floor', 'Walls', 'Pistonwall'))
+
+        # Every bullet in flight, culled once it leaves the map
+        self.bullets = BulletManager(pygame.Rect((0, 0), self.tile_grid.pixel_size))
+        self.all_sprites.bullets = self.bullets
+
+        # One path search towards the player shared by every enemy
+        self.flow_field = FlowField(self.tile_grid)
+        Monster.flow_field = self.flow_field
         
-        buttons_layer = tmx_map.get_layer_by_name('Buttons')
+        buttons_layer = self.map_data.get_layer('Buttons')
         
-        for obj in tmx_map.get_layer_by_name('Entities'): 
+        for obj in self.map_data.get_layer('Entities'): 
             if obj.name == 'Player':
                 self.player = Player(
                     pos=(obj.x, obj.y),
@@ -244,11 +387,12 @@ class Game:
                     path=PATHS['player'],
                     collision_sprites=self.obstacles,
                     create_bullet=self.create_bullet,
-                    display_surf=self.display_surface)
+                    display_surf=self.display_surface,
+                    controls=self.controls)
             
             if obj.name == 'Spawner':
                 spawn_number = obj.properties['spawner']
-                Spawner((obj.x, obj.y), [self.all_sprites, self.obstacles, self.spawners], self.obstacles, self.player, self.create_bullet, self.enemy_groups, spawn_number)
+                Spawner((obj.x, obj.y), [self.all_sprites, self.obstacles, self.spawners], self.obstacles, self.player, self.create_bullet, self.enemy_groups, spawn_number, self.map_data)
 
         for obj in buttons_layer:
             button_image_path = obj.source.replace("..", ".")
@@ -281,7 +425,7 @@ class Game:
                 button.door = doors[button_id][0]  # Assign the first door in the pair to the button
 
 
-        self.heart_surf = pygame.image.load('./graphics/other/heart.png').convert_alpha()
+        self.heart_surf = load_image('./graphics/other/heart.png')
         
     def extract_number_from_path(self, path):
         # Assuming the number is part of the filename, e.g., "1.png"
@@ -299,84 +443,167 @@ class Game:
         time.sleep(5)
 
     def check_button_presses(self):
-        current_time = pygame.time.get_ticks()
+        current_time = simtime.get_ticks()
         if current_time - self.last_button_press_time > self.button_cooldown:
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_e]:
-                for button in self.obstacles:
-                    if isinstance(button, Button) and self.player.rect.colliderect(button.rect):
+            if self.controls.state.pressed(pygame.K_e):
+                for button in self.obstacles.query_rect(self.player.rect):
+                    if isinstance(button, Button):
                         if not button.pressed:
                             print(f"Button pressed at {button.rect.topleft}")
                             button.press()
                             self.last_button_press_time = current_time  # Update the last press time
 
-    def run(self):
-        key_spawned = False  # Track whether the key has been spawned
+    def update(self, dt):
+        """Advances the simulation by one fixed step."""
+        self.controls.poll(self.tick)
+        self.tick += 1
+        simtime.advance(dt)
+        self.all_sprites.save_positions()
+        self.flow_field.update(self.player.rect.center, self.doors)
+        self.bullets.update(dt)
+        for sprite in self.all_sprites.sprites():
+            if not isinstance(sprite, PistonDoor):
+                sprite.update(dt)
+            elif isinstance(sprite, PistonDoor):
+                sprite.update(dt, self.tile_grid)
+        self.bullet_collision()
+        self.check_button_presses()
+
+        # Check if all spawners are destroyed and spawn the key
+        if not self.spawners and not self.key_spawned:
+            print("No spawners left. Spawning the key.")
+            for obj in self.map_data.objects_named('Key'):
+                Key((obj.x, obj.y), [self.all_sprites, self.obstacles], self.player)
+                self.key_spawned = True
+                break
+
+        if self.player.pos.x <= 0 or self.player.pos.y <= 0:
+            self.player.win = True
+
+    def draw(self, alpha):
+        self.display_surface.fill('black')
+        self.all_sprites.customize_draw(self.player, alpha)
+
+        self.hud.update(self.player.score, self.player.ammo, self.player.health, self.player.reloading)
+        self.hud.draw(self.display_surface)
+        pygame.display.update()
+
+    def run(self, ticks=None):
+        """
+        Runs the simulation at a fixed TICK_RATE and draws as often as FRAME_CAP allows,
+        interpolating between the last two steps so movement stays smooth at any frame rate.
+
+        Args:
+            ticks (int): Stop after this many simulation steps, None plays until the player escapes.
+        """
+        if self.headless:
+            self.run_headless(ticks)
+            return
+
+        step = 1 / TICK_RATE
+        accumulator = 0
 
         while not self.player.win:
+            if ticks is not None and self.tick >= ticks:
+                return
             # Event loop
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
-            dt = self.clock.tick() / 1000
-
-            # Update
-            for sprite in self.all_sprites.sprites():
-                if not isinstance(sprite, PistonDoor):
-                    sprite.update(dt)
-                elif isinstance(sprite, PistonDoor):
-                    sprite.update(dt, self.walls)
-            self.bullet_collision()
-            self.check_button_presses()
-
-            # Check if all spawners are destroyed and spawn the key
-            if not self.spawners and not key_spawned:
-                print("No spawners left. Spawning the key.")
-                tmx_map = load_pygame('./data/map.tmx')
-                for layer in tmx_map.layers:
-                    if layer.name == 'Entities':
-                        for obj in layer:
-                            if obj.name == 'Key':
-                                Key((obj.x, obj.y), [self.all_sprites, self.obstacles], self.player)
-                                key_spawned = True
-                                break
-
-            # Draw
-            self.display_surface.fill('black')
-            self.all_sprites.customize_draw(self.player)
-
-            Highscore_text = f'Score: {self.player.score}'
-            text_surf = self.font.render(Highscore_text, True, (255, 255, 255))
-            text_rect = text_surf.get_rect(midbottom=(WINDOW_WIDTH / 4, WINDOW_HEIGHT - 50))
-            self.display_surface.blit(text_surf, text_rect)
-            pygame.draw.rect(self.display_surface, (255, 255, 255), text_rect.inflate(30, 30), width=8, border_radius=5)
-
-            if self.player.health >= 1:
-                self.display_surface.blit(self.heart_surf, ((WINDOW_WIDTH / 60) + 200, WINDOW_HEIGHT / 90))
-            if self.player.health >= 2:
-                self.display_surface.blit(self.heart_surf, ((WINDOW_WIDTH / 60) + 100, WINDOW_HEIGHT / 90))
-            if self.player.health >= 3:
-                self.display_surface.blit(self.heart_surf, (WINDOW_WIDTH / 60, WINDOW_HEIGHT / 90))
-
-            self.ammo_display()
-            self.player.draw(self.display_surface)
-            if self.player.reloading:
-                self.Reload_display()
-            if self.player.pos.x <= 0 or self.player.pos.y <= 0:
-                self.player.win = True
-            pygame.display.update()
+            accumulator += min(self.clock.tick(FRAME_CAP) / 1000, MAX_FRAME_TIME)
+
+            while accumulator >= step and not self.player.win and (ticks is None or self.tick < ticks):
+                self.update(step)
+                accumulator -= step
+
+            self.draw(min(accumulator / step, 1))
+            if startup.active:
+                finish_startup_profile()
 
         self.display_win()
 
+    def run_headless(self, ticks=None):
+        """
+        Steps the simulation as fast as it can without drawing anything and reports the throughput.
+
+        Args:
+            ticks (int): Stop after this many simulation steps, None runs until the player escapes.
+        """
+        # Nothing is drawn, startup ends here instead of at the first frame
+        startup.finish('first tick')
+        step = 1 / TICK_RATE
+        start_tick = self.tick
+        start = time.perf_counter()
+        died = False
+        try:
+            while not self.player.win and (ticks is None or self.tick < ticks):
+                pygame.event.pump()
+                self.update(step)
+        except SystemExit:
+            # Player.check_death quits pygame and exits when the player dies, that ends the run here
+            died = True
+        elapsed = time.perf_counter() - start
+        steps = self.tick - start_tick
+        print(f'{steps} ticks in {elapsed:.2f}s ({steps / max(elapsed, 1e-9):.0f} ticks/s)')
+        if died:
+            print('The player died')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Apex Assault')
+    parser.add_argument('--headless', action='store_true', help='run the simulation only, without a window, sound or the intro')
+    parser.add_argument('--ticks', type=int, default=None, help='stop after this many simulation steps')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the random number generator')
+    parser.add_argument('--record', metavar='PATH', help='record the seed and every input to a file')
+    parser.add_argument('--replay', metavar='PATH', help='play a recorded session again, add --headless to run it as fast as possible')
+    return parser.parse_args()
+
+
+def make_controls(args):
+    """Picks the input source and seed from the command line, returns (controls, seed, recording)."""
+    if args.replay:
+        recording = Recording.load(args.replay)
+        if recording.tick_rate != TICK_RATE:
+            raise RecordingError(f'{args.replay} was recorded at {recording.tick_rate} ticks per second, the game runs at {TICK_RATE}')
+        return ReplayInput(recording), recording.seed, recording
+
+    controls = ScriptedInput() if args.headless else LiveInput()
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    if args.record:
+        recording = Recording(seed, TICK_RATE)
+        return InputRecorder(controls, recording), seed, recording
+    return controls, seed, None
+
+
+def play(game, args, recording):
+    ticks = args.ticks
+    if args.replay:
+        ticks = len(recording) if ticks is None else min(ticks, len(recording))
+    try:
+        game.run(ticks)
+    finally:
+        if args.record:
+            recording.save(args.record)
+            print(f'Recorded {len(recording)} ticks to {args.record}')
+        elif args.replay:
+            print(f'Replayed {game.tick} of {len(recording)} ticks, the recorded session took {sum(recording.step_times):.2f}s')
+
+
 if __name__ == '__main__':
+    args = parse_args()
+    controls, seed, recording = make_controls(args)
+
+    if args.headless:
+        play(Game(controls, headless=True, seed=seed), args, recording)
+        sys.exit()
+
     print('Please edit the settings file before playing.')
     
     intro = Intro()
     intro.run()
 
     if AGREE:
-        game = Game()
-        game.run()
+        play(Game(controls, seed=seed), args, recording)
     else:
-        print("You have not agreed to the t's and c's, find them in the settings file")
\ No newline at end of file
+        print("You have not agreed to the t's and c's, find them in the settings file")
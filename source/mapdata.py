@@ -0,0 +1,41 @@
+import pygame
+import pytmx
+from assets import tmx_image_loader
+
+
+class MapData:
+    """
+    Parses a Tiled map once and indexes everything the game looks up by name or number.
+
+    Args:
+        path (str): Path to the .tmx file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.tmx = pytmx.TiledMap(path, image_loader=tmx_image_loader)
+        self.tile_size = self.tmx.tilewidth
+        self.width = self.tmx.width
+        self.height = self.tmx.height
+
+        self.layers = {}
+        self.objects = {}       # object name -> [objects]
+        self.spawn_rects = {}   # spawner number -> pygame.Rect from the Spawns layer
+        self.door_stops = {}    # door_id -> pygame.Rect of the first door_stop with that id
+
+        for layer in self.tmx.layers:
+            self.layers[layer.name] = layer
+            if isinstance(layer, pytmx.TiledObjectGroup):
+                for obj in layer:
+                    self.objects.setdefault(obj.name, []).append(obj)
+
+        for obj in self.layers.get('Spawns', []):
+            self.spawn_rects.setdefault(obj.properties['spawner'], pygame.Rect(obj.x, obj.y, obj.width, obj.height))
+
+        for obj in self.objects.get('door_stop', []):
+            self.door_stops.setdefault(obj.properties['door_id'], pygame.Rect(obj.x, obj.y, obj.width, obj.height))
+
+    def get_layer(self, name):
+        return self.layers[name]
+
+    def objects_named(self, name):
+        return self.objects.get(name, [])
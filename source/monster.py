@@ -1,13 +1,21 @@
-import pygame
 from entity import Entity
 from pygame.math import Vector2 as vector
 from settings import *
+from assets import load_animations, load_image
+from audio import sounds
 import os
-from os import walk
 import time
-from math import sin
+import simtime
 
 class Monster():
+    # Shared FlowField towards the player, set up by the game
+    flow_field = None
+
+    # Crowd separation, monsters closer than the radius push each other apart
+    separation_radius = 50
+    separation_weight = 1.5
+    spawn_count = 0
+
     def get_player_distance_direction(self):
         enemy_pos = vector(self.rect.center)
         player_pos = vector(self.player.rect.center)
@@ -35,15 +43,60 @@ class Monster():
                 elif direction.y > 0: # player to the bottom
                     self.status = 'Idle'
 
+    def path_direction(self, direction):
+        """
+        Direction along the flow field around walls and doors, or straight at the player without one.
+        Heads for the middle of the next tile so the walking footprint stays clear of the walls.
+        """
+        if Monster.flow_field is not None:
+            waypoint = Monster.flow_field.waypoint(self.rect.center)
+            if waypoint is not None and waypoint != self.rect.center:
+                return (waypoint - self.rect.center).normalize()
+        return direction
+
+    def separation(self):
+        """
+        Sum of pushes away from the monsters within separation_radius, stronger the closer they are.
+        Only looks at the neighbours the obstacle spatial hash returns.
+        """
+        push = vector()
+        center = vector(self.rect.center)
+        for other in self.collision_sprites.query_radius(self.rect.center, self.separation_radius):
+            if other is self or not getattr(other, 'crowd', False):
+                continue
+            offset = center - other.rect.center
+            distance = offset.length()
+            if distance == 0:
+                # Exactly on top of each other, split them apart on a fixed axis
+                offset = vector(1, 0) if self.get_crowd_index() > other.get_crowd_index() else vector(-1, 0)
+                distance = 1
+            push += offset / distance * (1 - distance / self.separation_radius)
+        return push
+
+    def get_crowd_index(self):
+        """Number handed out in order of first use, a deterministic tie breaker between monsters."""
+        if not hasattr(self, 'crowd_index'):
+            Monster.spawn_count += 1
+            self.crowd_index = Monster.spawn_count
+        return self.crowd_index
+
+    def separate(self):
+        """Blends crowd separation into direction before Entity.move."""
+        push = self.separation()
+        if push.magnitude() != 0:
+            self.direction = self.direction + push * self.separation_weight
+
     def walk_to_player(self):
         distance, direction = self.get_player_distance_direction()
         if self.ranged_radius < distance < self.walk_radius:
-            self.direction = direction
+            self.direction = self.path_direction(direction)
             self.status = 'Walk'
         else:
             self.direction = vector()
 
 class Coffin(Entity, Monster):
+    crowd = True
+
     def __init__(self, pos, groups, path, collision_sprites, player):
         super().__init__(pos, groups, path, collision_sprites)
         
@@ -71,9 +124,8 @@ class Coffin(Entity, Monster):
             self.frame_index = 0
             if self.attacking:
                 self.attacking = False
-        self.image = current_animation[int(self.frame_index)]
-        self.mask = pygame.mask.from_surface(self.image)
-        self.hitbox = self.mask.get_bounding_rects()[0]
+        self.set_frame(current_animation[int(self.frame_index)])
+        self.hitbox = self.frame.hitbox.copy()
 
     def attack(self):
         distance = self.get_player_distance_direction()[0]
@@ -92,6 +144,7 @@ class Coffin(Entity, Monster):
         self.face_player()
         self.walk_to_player()
         self.attack()
+        self.separate()
         self.move(dt)
         self.animate(dt)
         self.blink()
@@ -99,6 +152,8 @@ class Coffin(Entity, Monster):
         self.vulnerability_timer()
 
 class Cactus(Entity, Monster):
+    crowd = True
+
     def __init__(self, pos, groups, path, collision_sprites, player, create_bullet):
         super().__init__(pos, groups, path, collision_sprites)
         self.player = player
@@ -131,9 +186,8 @@ class Cactus(Entity, Monster):
             self.frame_index = 0
             if self.attacking: self.attacking = False
 
-        self.image = current_animation[int(self.frame_index)]
-        self.mask = pygame.mask.from_surface(self.image)
-        self.hitbox = self.mask.get_bounding_rects()[0]
+        self.set_frame(current_animation[int(self.frame_index)])
+        self.hitbox = self.frame.hitbox.copy()
     
     def check_death(self):
         if self.health <= 0:
@@ -153,6 +207,7 @@ class Cactus(Entity, Monster):
         self.face_player()
         self.walk_to_player()
         self.attack()
+        self.separate()
         self.move(dt)
         self.animate(dt)
         self.check_death()
@@ -160,8 +215,14 @@ class Cactus(Entity, Monster):
         self.blink()
 
 class HybridEnemy(Entity, Monster):
+    crowd = True
+    # Side of the square hitbox around the center, smaller than a map tile so it fits the flow field's paths
+    footprint = 24
+
     def __init__(self, pos, groups, path, collision_sprites, player, create_bullet):
         super().__init__(pos, groups, path, collision_sprites)
+        # The hitbox stays this footprint in world space, animate doesn't replace it
+        self.hitbox = self.rect.inflate(self.footprint - self.rect.width, self.footprint - self.rect.height)
         
         # overwrites
         self.speed = 120
@@ -181,20 +242,16 @@ class HybridEnemy(Entity, Monster):
         self.dead = False
 
         # Load sounds
-        self.shoot_sound = pygame.mixer.Sound('./sound/charged_shot.mp3')
-        self.shoot_sound.set_volume(SHOOT_SOUND_VOLUME)
-        self.melee_attack_sound = pygame.mixer.Sound('./sound/damage.mp3')
-        self.melee_attack_sound.set_volume(0.1)
+        self.shoot_sound = sounds.clip('./sound/charged_shot.mp3', 'enemy', SHOOT_SOUND_VOLUME)
+        self.melee_attack_sound = sounds.clip('./sound/damage.mp3', 'enemy', 0.1)
 
-        # Load animations
-        self.animations = self.import_assets(path)
+        # Animations are already loaded (and shared) by Entity.__init__
         self.frame_index = 0
         self.status = 'Idle'
         self.damaging = False
 
         # Load projectile image
-        self.projectile_image = pygame.image.load(os.path.join(path, 'Projectile.png')).convert_alpha()
-        print(self.animations)
+        self.projectile_image = load_image(os.path.join(path, 'Projectile.png'))
         
         # Cooldowns
         self.melee_cooldown = 5000  # 5 seconds
@@ -204,34 +261,13 @@ class HybridEnemy(Entity, Monster):
         self.damage_cooldown = 1000  # 1 second
 
     def import_assets(self, path):
-        self.animations = {}
-        for index, folder in enumerate(walk(path)):
-            if index == 0:
-                for name in folder[1]:
-                    self.animations[name] = []
-            else:
-                for file_name in sorted(folder[2], key=lambda string: int(''.join(filter(str.isdigit, string)) or 0)):
-                    path = folder[0].replace('\\', '/') + '/' + file_name
-                    surf = pygame.image.load(path).convert_alpha()
-                    surf = pygame.transform.scale(surf, (surf.get_width() * 2, surf.get_height() * 2))  # Scale the image
-                    key = folder[0].split('\\')[1]
-                    self.animations[key].append(surf)
-                    print(f"Loaded {file_name} into {key}")
-        return self.animations
+        return load_animations(path, 2)
 
     def blink(self):
         """Blink effect to indicate damage."""
         if self.status != 'Die' and not self.is_vulnerable:
             if self.wave_value():
-                mask = pygame.mask.from_surface(self.image)
-                white_surf = mask.to_surface()
-                white_surf.set_colorkey((0, 0, 0))
-                self.image = white_surf
-
-    def wave_value(self):
-        """Helper method for blinking effect."""
-        value = sin(pygame.time.get_ticks())
-        return value >= 0
+                self.image = self.frame.silhouette(self.flipped)
 
     def damage(self):
         """Apply damage to the enemy and trigger the blink effect."""
@@ -239,7 +275,7 @@ class HybridEnemy(Entity, Monster):
             print('Enemy damaged')
             self.health -= 1
             self.is_vulnerable = False
-            self.hit_time = pygame.time.get_ticks()
+            self.hit_time = simtime.get_ticks()
 
     def animate(self, dt):
         """Update animations, excluding the 'Hurt' animation."""
@@ -265,9 +301,7 @@ class HybridEnemy(Entity, Monster):
             if self.frame_index >= len(current_animation):
                 self.frame_index = 0  # Loop idle animations
 
-            self.image = current_animation[int(self.frame_index)]
-            self.mask = pygame.mask.from_surface(self.image)
-            self.hitbox = self.mask.get_bounding_rects()[0]
+            self.set_frame(current_animation[int(self.frame_index)])
         elif self.status == 'Die':
             current_animation = self.animations.get(self.status)
             self.frame_index += 7 * dt
@@ -276,13 +310,25 @@ class HybridEnemy(Entity, Monster):
                 self.kill()
             if self.frame_index >= len(current_animation):
                 self.frame_index = 0  # Loop idle animations
-            self.image = current_animation[int(self.frame_index)]
-            self.mask = pygame.mask.from_surface(self.image)
-            self.hitbox = self.mask.get_bounding_rects()[0]
+            self.set_frame(current_animation[int(self.frame_index)])
+
+    def walk_to_player(self):
+        """
+        Walks along the flow field while the player is within walk_radius but out of sight,
+        stands still once there is a clear line of fire for check_attack.
+        """
+        distance, direction = self.get_player_distance_direction()
+        if self.melee_attack_radius <= distance < self.walk_radius and self.is_obstructed(self.rect.center, self.player.rect.center):
+            self.direction = self.path_direction(direction)
+            self.status = 'Walk'
+        else:
+            self.direction = vector()
+            if self.status == 'Walk':
+                self.status = 'Idle'
 
     def check_attack(self):
         """Handles attack decision-making based on player distance, obstructions, and cooldowns."""
-        current_time = pygame.time.get_ticks()
+        current_time = simtime.get_ticks()
         distance, direction = self.get_player_distance_direction()
 
         # Global cooldown check
@@ -339,7 +385,7 @@ class HybridEnemy(Entity, Monster):
                 self.hitbox = self.mask.get_bounding_rects()[0]  # Update hitbox position
 
     def isdamaging(self):
-        if self.damage_cooldown < pygame.time.get_ticks() - self.hit_time:
+        if self.damage_cooldown < simtime.get_ticks() - self.hit_time:
             self.is_vulnerable = True
             self.status = 'Idle'
             return True
@@ -351,6 +397,7 @@ class HybridEnemy(Entity, Monster):
         
         if not self.attacking:  # Only move if not attacking
             self.walk_to_player()
+            self.separate()
             self.move(dt)
 
         self.animate(dt)
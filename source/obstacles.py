@@ -0,0 +1,52 @@
+import pygame
+from spatial import SpatialGroup
+import simtime
+
+
+class Obstacles(SpatialGroup):
+    """
+    Everything that blocks movement: the dynamic obstacle sprites (doors, spawners, buttons,
+    the key and enemies), kept in a spatial hash, plus the static wall tiles, which live in
+    a TileGrid instead of being one sprite each.
+
+    Also answers line of sight queries. Walls and sprites with blocks_sight set (doors and
+    spawners) block sight, results are cached briefly per (start tile, end tile) and thrown
+    away as soon as one of those sprites moves or is removed.
+    """
+    def __init__(self, grid=None):
+        super().__init__()
+        self.grid = grid
+        self.los_cache = {}  # (start cell, end cell) -> (blocked, time)
+        self.los_cache_time = 250  # ms a cached result stays valid
+        self.los_cache_size = 4096
+
+    def moved(self, sprite):
+        super().moved(sprite)
+        if getattr(sprite, 'blocks_sight', False):
+            self.los_cache.clear()
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if getattr(sprite, 'blocks_sight', False):
+            self.los_cache.clear()
+
+    def occluder_on_segment(self, start, end):
+        area = pygame.Rect(min(start[0], end[0]), min(start[1], end[1]), abs(end[0] - start[0]) + 1, abs(end[1] - start[1]) + 1)
+        for sprite in self.query_rect(area):
+            if getattr(sprite, 'blocks_sight', False) and sprite.rect.clipline(start, end):
+                return True
+        return False
+
+    def line_of_sight_blocked(self, start, end):
+        """True if a wall tile, door or spawner lies between start and end."""
+        key = (self.grid.cell_at(start), self.grid.cell_at(end))
+        now = simtime.get_ticks()
+        cached = self.los_cache.get(key)
+        if cached is not None and now - cached[1] < self.los_cache_time:
+            return cached[0]
+
+        blocked = self.grid.raycast(start, end) is not None or self.occluder_on_segment(start, end)
+        if len(self.los_cache) >= self.los_cache_size:
+            self.los_cache.clear()
+        self.los_cache[key] = (blocked, now)
+        return blocked
@@ -3,28 +3,31 @@ import os
 from pygame.math import Vector2 as vector
 from entity import Entity
 from settings import *
+from assets import load_animations, load_image, SurfaceCache
+from audio import sounds
+from controls import LiveInput
+import simtime
 import sys
-from math import sin
 
 class Player(Entity):
-    def __init__(self, pos, groups, path, collision_sprites, create_bullet, display_surf):
+    def __init__(self, pos, groups, path, collision_sprites, create_bullet, display_surf, controls=None):
         super().__init__(pos, groups, path, collision_sprites)
         self.create_bullet = create_bullet
+        self.controls = controls if controls is not None else LiveInput()  # where keyboard and mouse state comes from
         self.bullet_shot = False
         self.health = 3
         self.reloading = False
         self.reload_start_time = 0
         self.reload_duration = 750
         self.ammo = AMMO
-        self.reload_sound = pygame.mixer.Sound('sound/reload.mp3')
+        self.reload_sound = sounds.clip('./sound/reload.mp3', 'player')
         self.score = 0
         self.display_surf = display_surf
         self.flip = False
         self.pickedup_key = False
         self.win = False
 
-        # Load animations
-        self.animations = self.import_assets(path)
+        # Animations are already loaded (and shared) by Entity.__init__
         self.frame_index = 0
         self.status = 'Walk'
         self.speed = 250
@@ -33,12 +36,18 @@ class Player(Entity):
         if self.status not in self.animations:
             self.status = list(self.animations.keys())[0] if self.animations else 'Idle'
 
-        self.shoot_effect = pygame.image.load('./graphics/other/shooteffect.png').convert_alpha()
-        self.bullet_surf = pygame.image.load('./graphics/other/bullet.png').convert_alpha()
-        self.bullet_surf = pygame.transform.scale(self.bullet_surf, (int(self.bullet_surf.get_width() * 2), int(self.bullet_surf.get_height() * 2)))
-        # Load shooting images
-        self.left_shooting_image = pygame.image.load('./graphics/player/left_shooting.png').convert_alpha()
-        self.right_shooting_image = pygame.image.load('./graphics/player/right_shooting.png').convert_alpha()
+        self.shoot_effect = load_image('./graphics/other/shooteffect.png')
+        self.bullet_surf = load_image('./graphics/other/bullet.png', 2)
+        # Weapon images, keyed by (attacking, aiming left), already enlarged and flipped
+        self.weapon_images = {
+            (False, False): self.prepare_weapon_image('./graphics/player/right.png', False),
+            (False, True): self.prepare_weapon_image('./graphics/player/left.png', True),
+            (True, False): self.prepare_weapon_image('./graphics/player/right_shooting.png', False),
+            (True, True): self.prepare_weapon_image('./graphics/player/left_shooting.png', True),
+        }
+        # Rotated weapon images, keyed by (attacking, aiming left, quantized angle)
+        self.rotation_step = 2  # degrees per cached rotation
+        self.rotation_cache = SurfaceCache(512)
 
         # Attributes for fading effect
         self.fade_start_time = 0
@@ -58,40 +67,38 @@ class Player(Entity):
 
     def import_assets(self, path):
         """Import animation assets from the given path."""
+        return load_animations(path, 2, Player.load_sheets)
+
+    @staticmethod
+    def load_sheets(path, scale):
+        """Loader for load_animations, every sprite sheet in the folder is one animation."""
         animations = {}
         for root, _, files in os.walk(path):
             for file in files:
                 if file.endswith('.png'):
                     animation_name = file.split('.')[0]
-                    image = pygame.image.load(os.path.join(root, file)).convert_alpha()
-                    image = pygame.transform.scale(image, (int(image.get_width() * 2), int(image.get_height() * 2)))
-                    frames = self.extract_frames(image)
+                    image = load_image(os.path.join(root, file), scale)
+                    frames = Player.extract_frames(image)
                     animations[animation_name] = frames
         return animations
 
     def blink(self):
         if not self.is_vulnerable:
             if self.wave_value():
-                mask = pygame.mask.from_surface(self.image)
-                white_surf = mask.to_surface()
-                white_surf.set_colorkey((0, 0, 0))
-                self.image = white_surf
-
-    def wave_value(self):
-        value = sin(pygame.time.get_ticks())
-        return value >= 0
+                self.image = self.frame.silhouette(self.flipped)
 
     def damage(self):
         if self.is_vulnerable:
             self.health -= 1
             self.is_vulnerable = False
-            self.hit_time = pygame.time.get_ticks()
+            self.hit_time = simtime.get_ticks()
             if not self.coffin_damage:
                 self.hit_sound.stop()
                 self.hit_sound.play()
 
 
-    def extract_frames(self, image):
+    @staticmethod
+    def extract_frames(image):
         """Extract frames from a sprite sheet image."""
         frames = []
         frame_width, frame_height = 16, 36
@@ -127,30 +134,30 @@ class Player(Entity):
 
     def input(self):
         """Handle player input for movement, shooting, and reloading."""
-        keys = pygame.key.get_pressed()
-        current_time = pygame.time.get_ticks()
+        controls = self.controls.state
+        current_time = simtime.get_ticks()
         if not self.attacking:
-            if keys[pygame.K_d]:
+            if controls.pressed(pygame.K_d):
                 self.direction.x = 1
                 self.status = 'Walk'
                 self.flip = False
-            elif keys[pygame.K_a]:
+            elif controls.pressed(pygame.K_a):
                 self.direction.x = -1
                 self.status = 'Walk'
                 self.flip = True
             else:
                 self.direction.x = 0
-            if keys[pygame.K_w]:
+            if controls.pressed(pygame.K_w):
                 self.direction.y = -1
                 self.status = 'Walk'
-            elif keys[pygame.K_s]:
+            elif controls.pressed(pygame.K_s):
                 self.direction.y = 1
                 self.status = 'Walk'
             else:
                 self.direction.y = 0
-            if keys[pygame.K_r]:
+            if controls.pressed(pygame.K_r):
                 self.reload()
-            if pygame.mouse.get_pressed()[0]:
+            if controls.mouse_buttons[0]:
                 if self.ammo > 0 and not self.reloading and (current_time - self.last_shot_time >= self.shot_cooldown):
                     self.attacking = True
                     self.direction = vector()
@@ -167,7 +174,7 @@ class Player(Entity):
 
     def animate(self, dt):
         """Animate the player sprite based on the current status."""
-        current_animation = self.animations.get(self.status, [self.image])
+        current_animation = self.animations.get(self.status, [self.frame])
         
         self.frame_index += 7 * dt
         if int(self.frame_index) >= len(current_animation):
@@ -175,46 +182,38 @@ class Player(Entity):
             if self.attacking:
                 self.attacking = False
         
-        self.image = current_animation[int(self.frame_index)]
-        if self.flip:
-            self.image = pygame.transform.flip(self.image, True, False)
-        self.mask = pygame.mask.from_surface(self.image)
+        self.set_frame(current_animation[int(self.frame_index)], self.flip)
+
+    @staticmethod
+    def prepare_weapon_image(path, left):
+        """Enlarge a weapon image by 1.5 and flip it on both axes if it is aimed to the left."""
+        image = load_image(path, 1.5)
+        if left:
+            image = pygame.transform.flip(image, True, True)
+        return image
+
+    def rotated_weapon_image(self, left, angle):
+        """Return the weapon image rotated to the nearest rotation_step, from the rotation cache."""
+        step = self.rotation_step
+        angle = round(angle / step) * step % 360
+        key = (self.attacking, left, angle)
+        image = self.weapon_images[(self.attacking, left)]
+        return self.rotation_cache.get(key, lambda: pygame.transform.rotate(image, -angle))
 
     def draw(self, screen):
         """Draw the player sprite on the screen."""
         mouse_direction = self.get_mouse_direction()
         angle = -mouse_direction.angle_to(vector(1, 0))  # Calculate rotation angle
 
-        # Choose and load image based on mouse direction and shooting status
-        if self.attacking:
-            if mouse_direction.x < 0:
-                player_image = self.left_shooting_image
-            else:
-                player_image = self.right_shooting_image
-        else:
-            if mouse_direction.x < 0:
-                image_path = './graphics/player/left.png'
-            else:
-                image_path = './graphics/player/right.png'
-            player_image = pygame.image.load(image_path).convert_alpha()
-
-        # Enlarge the image by a factor of 2
-        width, height = player_image.get_size()
-        enlarged_image = pygame.transform.scale(player_image, (width * 1.5, height * 1.5))
-
-        # Flip the image if it is left.png
-        if mouse_direction.x < 0:
-            enlarged_image = pygame.transform.flip(enlarged_image, True, False)  # Flip horizontally
-            enlarged_image = pygame.transform.flip(enlarged_image, False, True)  # Flip vertically
-
-        # Rotate the image
-        rotated_image = pygame.transform.rotate(enlarged_image, -angle)
+        # Choose the prepared image based on mouse direction and shooting status, then rotate it
+        rotated_image = self.rotated_weapon_image(mouse_direction.x < 0, angle)
 
-        # Position the arrow image a little away from the player
+        # Position the arrow image a little away from the player, who is always at the centre of the screen
+        screen_center = vector(screen.get_rect().center)
         if self.attacking:
-            self.arrow_pos = vector(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2) + (mouse_direction * 200)
+            self.arrow_pos = screen_center + (mouse_direction * 200)
         else:
-            self.arrow_pos = vector(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2) + (mouse_direction * 50)
+            self.arrow_pos = screen_center + (mouse_direction * 50)
 
         # Get rect and draw player image
         arrow_rect = rotated_image.get_rect(center=self.arrow_pos)
@@ -224,7 +223,7 @@ class Player(Entity):
         """Reload the player's weapon if ammo is less than the maximum."""
         if self.ammo < AMMO and not self.reloading:
             self.reloading = True
-            self.reload_start_time = pygame.time.get_ticks()
+            self.reload_start_time = simtime.get_ticks()
             self.reload_sound.play()
 
     def check_death(self):
@@ -235,7 +234,7 @@ class Player(Entity):
 
     def get_mouse_direction(self):
         """Get the direction vector from the player to the mouse cursor."""
-        mouse_pos = vector(pygame.mouse.get_pos())  # Get mouse position
+        mouse_pos = vector(self.controls.state.mouse_pos)  # Get mouse position
         player_pos = vector(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)  # Player is always at window center
 
         if mouse_pos == player_pos:
@@ -251,7 +250,7 @@ class Player(Entity):
     def update(self, dt):
         """Update the player's state and handle animations, input, and other actions."""
         if self.reloading:
-            elapsed_time = pygame.time.get_ticks() - self.reload_start_time
+            elapsed_time = simtime.get_ticks() - self.reload_start_time
             if elapsed_time >= self.reload_duration:
                 self.reloading = False
                 self.ammo = AMMO
@@ -263,11 +262,10 @@ class Player(Entity):
         self.blink()
         self.vulnerability_timer()
         self.check_death()
-        self.draw(self.display_surf)
 
         # Start fading if player shot and attacking just stopped
         if not self.attacking and self.shot and not self.fading:
-            self.fade_start_time = pygame.time.get_ticks()
+            self.fade_start_time = simtime.get_ticks()
             self.fading = True
             self.current_alpha = 255
             self.shot = False  # Reset shot flag
@@ -0,0 +1,66 @@
+import time
+import json
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Records a timeline of startup phases (imports, display init, map parse, asset loads...).
+
+    Phases can nest. Recording stops once finish() is called, usually on the first game frame,
+    so the per asset hooks cost nothing for the rest of the session.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []  # (name, start, duration, depth), times in seconds since origin
+        self.marks = {}   # name -> time since origin
+        self.depth = 0
+        self.active = True
+
+    def now(self):
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name):
+        if not self.active:
+            yield
+            return
+        start = self.now()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.events.append((name, start, self.now() - start, self.depth))
+
+    def mark(self, name):
+        """Records a point in time, only the first mark with a given name is kept."""
+        if self.active and name not in self.marks:
+            self.marks[name] = self.now()
+
+    def finish(self, mark='first game frame'):
+        self.mark(mark)
+        self.active = False
+
+    def report(self, min_duration=0.001):
+        """Returns the timeline as text, phases shorter than min_duration seconds are left out."""
+        lines = ['Startup timeline (ms since process start)']
+        for name, start, duration, depth in sorted(self.events, key=lambda event: (event[1], event[3])):
+            if duration >= min_duration:
+                lines.append(f'{start * 1000:9.1f} {duration * 1000:9.1f}  {"  " * depth}{name}')
+        for name, at in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f'{at * 1000:9.1f} {"":>9}  * {name}')
+        return '\n'.join(lines)
+
+    def export(self, path):
+        """Writes the timeline in Chrome trace format, open it in chrome://tracing or Perfetto."""
+        trace = [
+            {'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6, 'pid': 0, 'tid': 0}
+            for name, start, duration, _ in self.events
+        ]
+        trace += [{'name': name, 'ph': 'i', 's': 'g', 'ts': at * 1e6, 'pid': 0, 'tid': 0} for name, at in self.marks.items()]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': trace}, file)
+
+
+startup = StartupProfiler()
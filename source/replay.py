@@ -0,0 +1,111 @@
+import struct
+import time
+import zlib
+from controls import GAME_KEYS, InputState, ScriptedInput
+
+# File layout: header, then the zlib compressed ticks
+MAGIC = b'APXR'
+VERSION = 1
+HEADER = struct.Struct('<4sBHIII')  # magic, version, tick rate, seed, tick count, body size
+TICK = struct.Struct('<HhhH')       # input bits, mouse x, mouse y, time since the previous tick in 10us steps
+
+MOUSE_BUTTON_BITS = len(GAME_KEYS)  # mouse buttons come after the key bits
+
+
+class RecordingError(Exception):
+    pass
+
+
+def pack_state(state):
+    bits = 0
+    for index, key in enumerate(GAME_KEYS):
+        if state.pressed(key):
+            bits |= 1 << index
+    for index, button in enumerate(state.mouse_buttons):
+        if button:
+            bits |= 1 << (MOUSE_BUTTON_BITS + index)
+    return bits
+
+
+def unpack_state(bits, mouse_x, mouse_y):
+    keys = [key for index, key in enumerate(GAME_KEYS) if bits & (1 << index)]
+    buttons = [bool(bits & (1 << (MOUSE_BUTTON_BITS + index))) for index in range(3)]
+    return InputState(keys, (mouse_x, mouse_y), buttons)
+
+
+class Recording:
+    """
+    Everything needed to play a session again: the RNG seed, the tick rate and the input of every
+    simulation step, plus how long each step took when it was recorded.
+
+    Args:
+        seed (int): Seed the game's random module was started with.
+        tick_rate (int): Simulation steps per second of the recorded session.
+    """
+    def __init__(self, seed, tick_rate):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.states = []
+        self.step_times = []  # seconds of real time between a step and the one before it
+
+    def __len__(self):
+        return len(self.states)
+
+    def save(self, path):
+        body = b''.join(
+            TICK.pack(pack_state(state), *state.mouse_pos, min(int(step_time * 100000), 0xFFFF))
+            for state, step_time in zip(self.states, self.step_times))
+        body = zlib.compress(body)
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.tick_rate, self.seed, len(self.states), len(body)))
+            file.write(body)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise RecordingError(f'{path} is too short to be a recording')
+        magic, version, tick_rate, seed, count, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise RecordingError(f'{path} is not a version {VERSION} recording')
+
+        recording = cls(seed, tick_rate)
+        body = zlib.decompress(data[HEADER.size:HEADER.size + size])
+        for bits, mouse_x, mouse_y, step_time in TICK.iter_unpack(body[:count * TICK.size]):
+            recording.states.append(unpack_state(bits, mouse_x, mouse_y))
+            recording.step_times.append(step_time / 100000)
+        return recording
+
+
+class InputRecorder:
+    """
+    Wraps another input source and writes down every state it returns, one per simulation step.
+
+    Args:
+        source: The input source the player actually uses, usually LiveInput.
+        recording (Recording): Where the states go.
+    """
+    def __init__(self, source, recording):
+        self.source = source
+        self.recording = recording
+        self.last_poll = None
+
+    @property
+    def state(self):
+        return self.source.state
+
+    def poll(self, tick):
+        state = self.source.poll(tick)
+        now = time.perf_counter()
+        self.recording.states.append(state)
+        self.recording.step_times.append(0 if self.last_poll is None else now - self.last_poll)
+        self.last_poll = now
+        return state
+
+
+class ReplayInput(ScriptedInput):
+    """Feeds a Recording back to the game, step by step."""
+    def __init__(self, recording):
+        super().__init__(recording.states)
+        self.recording = recording
@@ -8,6 +8,10 @@ PATHS = {
 	'cactus': './graphics/monster/cactus'
 }
 AMMO = 20
+# Simulation updates per second, the game logic always steps by 1 / TICK_RATE
+TICK_RATE = 120
+# Longest frame the simulation catches up on, anything slower runs the game in slow motion instead
+MAX_FRAME_TIME = 0.25
 SCROLLING_TEXT = [
             "The year is 2147. The world as we knew it has changed forever.",
             "Once a beacon of progress, Cyber City now stands on the edge of ruin.",
@@ -71,6 +75,19 @@ SHOOT_SOUND_VOLUME = 0.2
 MUSIC_VOLUME = 1
 DIFFICULTY = 1
 
+# Frames drawn per second at most, 0 for no limit
+FRAME_CAP = 144
+
+# Resolution the world is drawn at before it is scaled up (or down) to the window, None draws it at window size.
+# e.g. (1280, 720) with a 2560x1440 window. The HUD is always drawn at window size
+RENDER_RESOLUTION = None
+SMOOTH_SCALING = True
+
+# Print a timeline of startup phases once the first game frame is drawn,
+# and also write it as a Chrome trace file if a path is given
+PROFILE_STARTUP = False
+STARTUP_PROFILE_PATH = ''
+
 # Please consent to the required Modules being installed below by changing MODS to True 
 MODS = True
 # Please agree to the T's and C's below with a True or False
@@ -0,0 +1,23 @@
+"""
+The simulation clock. Gameplay code reads the time from here instead of pygame.time.get_ticks(),
+it only moves when the game steps, so a replayed or headless run sees exactly the same times
+as the run it reproduces, however fast it goes.
+"""
+
+_milliseconds = 0.0
+
+
+def get_ticks():
+    """Milliseconds of simulated time, like pygame.time.get_ticks()."""
+    return int(_milliseconds)
+
+
+def advance(dt):
+    """Moves the clock forward by dt seconds."""
+    global _milliseconds
+    _milliseconds += dt * 1000
+
+
+def reset(milliseconds=0):
+    global _milliseconds
+    _milliseconds = float(milliseconds)
@@ -0,0 +1,123 @@
+import pygame
+
+
+class SpatialHash:
+    """
+    Uniform grid of buckets over world space. A sprite is stored in every cell its rect overlaps,
+    so a query only looks at the sprites in the cells it touches.
+
+    Buckets are dicts used as ordered sets, which keeps query results in a deterministic order.
+
+    Args:
+        cell_size (int): Width and height of a cell in pixels.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.buckets = {}       # (col, row) -> {sprite: None}
+        self.sprite_cells = {}  # sprite -> (col_start, col_end, row_start, row_end)
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return rect.left // size, (rect.right - 1) // size + 1, rect.top // size, (rect.bottom - 1) // size + 1
+
+    def insert(self, sprite):
+        cells = self.cell_range(sprite.rect)
+        self.sprite_cells[sprite] = cells
+        col_start, col_end, row_start, row_end = cells
+        for col in range(col_start, col_end):
+            for row in range(row_start, row_end):
+                self.buckets.setdefault((col, row), {})[sprite] = None
+
+    def remove(self, sprite):
+        cells = self.sprite_cells.pop(sprite, None)
+        if cells is None:
+            return
+        col_start, col_end, row_start, row_end = cells
+        for col in range(col_start, col_end):
+            for row in range(row_start, row_end):
+                bucket = self.buckets.get((col, row))
+                if bucket is not None:
+                    bucket.pop(sprite, None)
+                    if not bucket:
+                        del self.buckets[(col, row)]
+
+    def update(self, sprite):
+        """Re-buckets a sprite after its rect changed. Does nothing unless it crossed a cell border."""
+        if self.sprite_cells.get(sprite) != self.cell_range(sprite.rect):
+            self.remove(sprite)
+            self.insert(sprite)
+
+    def candidates(self, rect):
+        """Every sprite stored in a cell rect touches, without an exact overlap test."""
+        found = {}
+        col_start, col_end, row_start, row_end = self.cell_range(rect)
+        for col in range(col_start, col_end):
+            for row in range(row_start, row_end):
+                bucket = self.buckets.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def query_rect(self, rect):
+        """Sprites whose rect overlaps rect."""
+        return [sprite for sprite in self.candidates(rect) if sprite.rect.colliderect(rect)]
+
+    def query_radius(self, pos, radius):
+        """Sprites whose rect center lies within radius of pos."""
+        x, y = pos
+        area = pygame.Rect(int(x - radius), int(y - radius), int(radius * 2) + 1, int(radius * 2) + 1)
+        radius_squared = radius * radius
+        found = []
+        for sprite in self.candidates(area):
+            dx = sprite.rect.centerx - x
+            dy = sprite.rect.centery - y
+            if dx * dx + dy * dy <= radius_squared:
+                found.append(sprite)
+        return found
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    A sprite group that keeps a SpatialHash of its members up to date as sprites are added,
+    killed or moved. Sprites that move have to call notify_moved() afterwards.
+
+    Sprites join their groups before they have a rect, so new members are only hashed
+    on the next query.
+    """
+    def __init__(self, *sprites, cell_size=128):
+        self.spatial_hash = SpatialHash(cell_size)
+        self.pending = {}
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite)
+        self.pending[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.pending.pop(sprite, None)
+        self.spatial_hash.remove(sprite)
+
+    def flush(self):
+        for sprite in self.pending:
+            self.spatial_hash.insert(sprite)
+        self.pending.clear()
+
+    def moved(self, sprite):
+        if sprite not in self.pending:
+            self.spatial_hash.update(sprite)
+
+    def query_rect(self, rect):
+        self.flush()
+        return self.spatial_hash.query_rect(rect)
+
+    def query_radius(self, pos, radius):
+        self.flush()
+        return self.spatial_hash.query_radius(pos, radius)
+
+
+def notify_moved(sprite):
+    """Tells every spatially indexed group the sprite belongs to that its rect changed."""
+    for group in sprite.groups():
+        if isinstance(group, SpatialGroup):
+            group.moved(sprite)
@@ -1,35 +1,39 @@
 import pygame
 import random
 from sprite import Sprite, Key
+from assets import load_image
 from monster import Coffin, Cactus, HybridEnemy
 from settings import PATHS, DIFFICULTY, WINDOW_WIDTH, WINDOW_HEIGHT
 import math
-import pytmx
+import simtime
 
 # Define custom exception
 class SpawnRectNotFound(Exception):
     pass
 
 class Spawner(Sprite):
-    def __init__(self, pos, groups, collision_sprites, player, create_bullet, enemy_groups, spawn_number):
-        super().__init__(pos, pygame.image.load('./graphics/other/spawner_.png').convert_alpha(), groups)
+    blocks_sight = True
+
+    def __init__(self, pos, groups, collision_sprites, player, create_bullet, enemy_groups, spawn_number, map_data):
+        super().__init__(pos, load_image('./graphics/other/spawner_.png'), groups)
         self.collision_sprites = collision_sprites
         self.player = player
         self.create_bullet = create_bullet
         self.enemy_groups = enemy_groups
         self.spawn_number = spawn_number
+        self.map_data = map_data
 
         # Other initialization code...
         self.frames = [
-            pygame.image.load('./graphics/other/spawner_.png').convert_alpha(),
-            pygame.image.load('./graphics/other/spawner_x.png').convert_alpha(),
-            pygame.image.load('./graphics/other/spawner_xx.png').convert_alpha(),
-            pygame.image.load('./graphics/other/spawner_xxx.png').convert_alpha()
+            load_image('./graphics/other/spawner_.png'),
+            load_image('./graphics/other/spawner_x.png'),
+            load_image('./graphics/other/spawner_xx.png'),
+            load_image('./graphics/other/spawner_xxx.png')
         ]
         self.health = 3
         self.spawn_radius = 100
         self.spawn_cooldown = 5000
-        self.last_spawn_time = pygame.time.get_ticks()
+        self.last_spawn_time = simtime.get_ticks()
         self.spawned_enemies = []
         self.spawn_rect = self.find_spawn_rect()
         self.frame_index = 0
@@ -59,7 +63,9 @@ class Spawner(Sprite):
             temp_enemy_rect = temp_enemy.rect
 
             # Check if the spawn position collides with any collision object
-            if not pygame.sprite.spritecollide(temp_enemy, self.collision_sprites, False, pygame.sprite.collide_mask):
+            nearby = self.collision_sprites.query_rect(temp_enemy.rect)
+            if not (pygame.sprite.spritecollide(temp_enemy, nearby, False, pygame.sprite.collide_mask)
+                    or self.collision_sprites.grid.collide_mask(temp_enemy)):
                 # Spawn the enemy and add it to the spawner's local enemy list
                 new_enemy = HybridEnemy(spawn_pos, self.enemy_groups, './graphics/enemy', self.collision_sprites, self.player, self.create_bullet)
                 self.spawned_enemies.append(new_enemy)
@@ -74,17 +80,11 @@ class Spawner(Sprite):
                 self.spawn_enemy()  # Retry spawning an enemy
 
     def find_spawn_rect(self):
-        tmx_map = pytmx.load_pygame('./data/map.tmx')
-        found_rects = []
-        for layer in tmx_map.layers:
-            if layer.name == 'Spawns':
-                for obj in layer:
-                    found_rects.append((obj.spawner, pygame.Rect(obj.x, obj.y, obj.width, obj.height)))
-                    if obj.spawner == self.spawn_number:
-                        spawn_rect = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
-                        print('found spawner rect:', spawn_rect, obj.spawner)
-                        return spawn_rect
-        raise SpawnRectNotFound(f'Spawn rectangle with spawner number {self.spawn_number} not found. Found rects: {found_rects}')
+        spawn_rect = self.map_data.spawn_rects.get(self.spawn_number)
+        if spawn_rect is None:
+            found_rects = list(self.map_data.spawn_rects.items())
+            raise SpawnRectNotFound(f'Spawn rectangle with spawner number {self.spawn_number} not found. Found rects: {found_rects}')
+        return spawn_rect
 
     def player_in_spawn_rect(self):
         if not self.spawn_rect:
@@ -93,7 +93,7 @@ class Spawner(Sprite):
         return player_in_rect
 
     def update(self, dt):
-        current_time = pygame.time.get_ticks()
+        current_time = simtime.get_ticks()
         if self.player_in_spawn_rect():
             
             if current_time - self.last_spawn_time > self.spawn_cooldown:
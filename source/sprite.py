@@ -1,6 +1,7 @@
 import pygame
-from pygame.math import Vector2 as vector
 import random
+from assets import load_image
+from audio import sounds
 
 class Sprite(pygame.sprite.Sprite):
     def __init__(self, pos, surf, groups):
@@ -11,37 +12,25 @@ class Sprite(pygame.sprite.Sprite):
         self.hitbox = self.rect.inflate(0, -self.rect.height / 3)
         self.mask = pygame.mask.from_surface(self.image)
 
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, pos, direction, surf, groups, shooter):
-        super().__init__(groups)
-        self.image = surf
-        self.rect = self.image.get_rect(center=pos)
-        self.pos = vector(self.rect.center)
-        self.direction = direction.normalize()
-        self.speed = 400
-        self.shooter = shooter  # Store the reference to the shooter
-
-    def update(self, dt):
-        self.pos += self.direction * self.speed * dt
-        self.rect.center = self.pos
-
-        
-
 class Button(pygame.sprite.Sprite):
+    # Flat on the floor, drawn under everything that stands
+    render_layer = 'floor'
+
     # Shared state for buttons with the same ID
     button_states = {}
 
     def __init__(self, pos, image_path, groups, door=None, player=None, button_id=None):
         super().__init__(groups)
-        self.image = pygame.image.load(image_path).convert_alpha()
+        self.image = load_image(image_path)
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(0, 0)
+        self.mask = pygame.mask.from_surface(self.image)
         self.door = door
         self.player = player
         self.pressed = False
         self.button_id = button_id
-        self.sound = pygame.mixer.Sound('./sound/opening.mp3')  # Load the sound
-        self.deny_sound = pygame.mixer.Sound('./sound/denied.mp3')
+        self.sound = sounds.clip('./sound/opening.mp3', 'doors')  # Load the sound
+        self.deny_sound = sounds.clip('./sound/denied.mp3', 'ui')
 
         # Initialize the shared state for this button ID
         if self.button_id not in Button.button_states:
@@ -72,10 +61,7 @@ class Button(pygame.sprite.Sprite):
 class Key(pygame.sprite.Sprite):
     def __init__(self, pos, groups, player):
         super().__init__(groups)
-        original_image = pygame.image.load('./graphics/key.png').convert_alpha()
-        scale_factor = 2.5
-        new_size = (int(original_image.get_width() * scale_factor), int(original_image.get_height() * scale_factor))
-        self.image = pygame.transform.scale(original_image, new_size)
+        self.image = load_image('./graphics/key.png', 2.5)
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(0, -self.rect.height / 3)
         self.mask = pygame.mask.from_surface(self.image)
@@ -0,0 +1,144 @@
+import pygame
+import numpy as np
+
+# Layer bits stored per cell
+WALLS = 1
+PISTONWALL = 2
+ALL_LAYERS = WALLS | PISTONWALL
+
+LAYER_BITS = {
+    'Walls': WALLS,
+    'Pistonwall': PISTONWALL,
+}
+
+
+class TileGrid:
+    """
+    The static wall layers of the map as a 2D occupancy grid.
+
+    Every cell stores a bit per layer that has a tile there, so collision lookups cost
+    one array read per cell the caller overlaps instead of one test per wall sprite.
+    Tile images are kept per cell for pixel perfect tests.
+
+    Args:
+        map_data (MapData): Parsed map to read the tile layers from.
+        layer_names (iterable): Tile layers that block movement, see LAYER_BITS.
+    """
+    def __init__(self, map_data, layer_names=('Walls', 'Pistonwall')):
+        self.tile_size = map_data.tile_size
+        self.cols = map_data.width
+        self.rows = map_data.height
+        self.cells = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self.images = {}  # (col, row) -> [surfaces], in layer order
+        self.masks = {}   # id(surface) -> mask
+
+        for name in layer_names:
+            bit = LAYER_BITS[name]
+            for x, y, surf in map_data.get_layer(name).tiles():
+                self.cells[y, x] |= bit
+                self.images.setdefault((x, y), []).append(surf)
+                if id(surf) not in self.masks:
+                    self.masks[id(surf)] = pygame.mask.from_surface(surf)
+
+        # Collision box of a tile inside its cell, the same as Sprite's hitbox
+        size = self.tile_size
+        self.tile_hitbox = pygame.Rect(0, 0, size, size).inflate(0, -size / 3)
+
+    @property
+    def pixel_size(self):
+        return self.cols * self.tile_size, self.rows * self.tile_size
+
+    def cell_at(self, pos):
+        return int(pos[0] // self.tile_size), int(pos[1] // self.tile_size)
+
+    def cell_range(self, rect):
+        """Returns (first col, last col + 1, first row, last row + 1) of the cells rect overlaps, clamped to the map."""
+        size = self.tile_size
+        col_start = max(rect.left // size, 0)
+        col_end = min((rect.right - 1) // size + 1, self.cols)
+        row_start = max(rect.top // size, 0)
+        row_end = min((rect.bottom - 1) // size + 1, self.rows)
+        return col_start, col_end, row_start, row_end
+
+    def solid_cells(self, rect, layers=ALL_LAYERS):
+        """Yields (col, row) of every cell overlapping rect that has a tile on one of the given layers."""
+        col_start, col_end, row_start, row_end = self.cell_range(rect)
+        if col_start >= col_end or row_start >= row_end:
+            return
+        block = self.cells[row_start:row_end, col_start:col_end] & layers
+        for row, col in zip(*np.nonzero(block)):
+            yield col_start + int(col), row_start + int(row)
+
+    def is_solid(self, col, row, layers=ALL_LAYERS):
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return bool(self.cells[row, col] & layers)
+        return False
+
+    def cell_rect(self, col, row):
+        size = self.tile_size
+        return pygame.Rect(col * size, row * size, size, size)
+
+    def segment_cells(self, start, end):
+        """
+        Yields every cell a line segment passes through, in order, using the Amanatides-Woo
+        grid traversal. Cells outside the map are skipped but the walk continues.
+        """
+        size = self.tile_size
+        x, y = start[0] / size, start[1] / size
+        end_x, end_y = end[0] / size, end[1] / size
+        col, row = int(x // 1), int(y // 1)
+        end_col, end_row = int(end_x // 1), int(end_y // 1)
+        dx, dy = end_x - x, end_y - y
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+        # Distance along the segment (0..1) to the first vertical / horizontal cell border, and between borders
+        t_delta_x = abs(1 / dx) if dx else float('inf')
+        t_delta_y = abs(1 / dy) if dy else float('inf')
+        t_max_x = ((col + 1 - x) if dx > 0 else (x - col)) * t_delta_x if dx else float('inf')
+        t_max_y = ((row + 1 - y) if dy > 0 else (y - row)) * t_delta_y if dy else float('inf')
+
+        for _ in range(abs(end_col - col) + abs(end_row - row) + 1):
+            if 0 <= col < self.cols and 0 <= row < self.rows:
+                yield col, row
+            if col == end_col and row == end_row:
+                return
+            if t_max_x < t_max_y:
+                t_max_x += t_delta_x
+                col += step_col
+            else:
+                t_max_y += t_delta_y
+                row += step_row
+
+    def raycast(self, start, end, layers=ALL_LAYERS):
+        """Returns the first solid (col, row) on the segment from start to end, or None if it is clear."""
+        cells = self.cells
+        for col, row in self.segment_cells(start, end):
+            if cells[row, col] & layers:
+                return col, row
+        return None
+
+    def hitboxes_in(self, rect, layers=ALL_LAYERS):
+        """Hitboxes of the tiles around rect that actually overlap it."""
+        hitboxes = []
+        for col, row in self.solid_cells(rect, layers):
+            hitbox = self.tile_hitbox.move(col * self.tile_size, row * self.tile_size)
+            if hitbox.colliderect(rect):
+                hitboxes.append(hitbox)
+        return hitboxes
+
+    def collide_rect(self, rect, layers=ALL_LAYERS):
+        """True if rect overlaps any tile cell (the full cell, not the trimmed hitbox)."""
+        return next(self.solid_cells(rect, layers), None) is not None
+
+    def collide_mask(self, sprite, layers=ALL_LAYERS):
+        """Pixel perfect test of a sprite's mask against the tile images under its rect."""
+        mask = getattr(sprite, 'mask', None)
+        if mask is None:
+            mask = pygame.mask.from_surface(sprite.image)
+        for col, row in self.solid_cells(sprite.rect, layers):
+            tile_x = col * self.tile_size
+            tile_y = row * self.tile_size
+            for surf in self.images[(col, row)]:
+                if mask.overlap(self.masks[id(surf)], (tile_x - sprite.rect.x, tile_y - sprite.rect.y)):
+                    return True
+        return False